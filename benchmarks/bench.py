@@ -0,0 +1,245 @@
+"""Offline benchmark of the MCP server against the mock Bar Assistant API.
+
+Starts ``mock_api.py`` and the server as subprocesses, then drives tool
+calls and resource reads through the real MCP stdio protocol. For each
+scenario it reports throughput, p50/p95/p99 latency and the API requests
+the calls caused.
+
+    python benchmarks/bench.py --calls 50 --concurrency 4
+    python benchmarks/bench.py --json results.json
+    python benchmarks/bench.py --baseline results.json --tolerance 0.25
+
+Server settings are read from the environment as usual, so e.g.
+``BAR_ASSISTANT_CACHE=false python benchmarks/bench.py`` benchmarks the
+server without its response cache.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+import mock_api
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def scenarios(args):
+    """The tool calls and resource reads to benchmark, in order.
+
+    Reads come first; shelf changes are applied and then undone so every
+    scenario sees the same catalog.
+    """
+    name = mock_api.ingredient_name
+    names = [name(i) for i in range(0, 40, 4)]
+    off_shelf = [args.shelf + 1, args.shelf + 2]
+    return [
+        ("list_bars", "tool", "list_bars", {}),
+        ("get_shelf_ingredients", "tool", "get_shelf_ingredients", {}),
+        ("get_shelf_ingredients (window)", "tool", "get_shelf_ingredients", {"limit": 10, "fields": ["name"]}),
+        ("get_shelf_cocktails", "tool", "get_shelf_cocktails", {}),
+        ("get_shelf_cocktails (json)", "tool", "get_shelf_cocktails", {"format": "json"}),
+        ("get_shelf_cocktails (details)", "tool", "get_shelf_cocktails", {"limit": 20, "details": True}),
+        ("get_bars_shelf_cocktails (all)", "tool", "get_bars_shelf_cocktails", {"limit": 20}),
+        ("what_can_i_make", "tool", "what_can_i_make", {}),
+        ("what_can_i_make (next_purchase)", "tool", "what_can_i_make", {"query": "next_purchase"}),
+        ("search_ingredients", "tool", "search_ingredients", {"name": name(6)}),
+        ("match_ingredients", "tool", "match_ingredients", {"name": "angostura bitter"}),
+        ("resolve_ingredients", "tool", "resolve_ingredients", {"names": names}),
+        ("bar://shelf/ingredients", "resource", "bar://shelf/ingredients", None),
+        ("bar://shelf/cocktails", "resource", "bar://shelf/cocktails", None),
+        ("add_ingredients_to_shelf", "tool", "add_ingredients_to_shelf", {"ingredient_ids": off_shelf}),
+        ("remove_ingredients_from_shelf", "tool", "remove_ingredients_from_shelf", {"ingredient_ids": off_shelf}),
+    ]
+
+
+def percentile(values, q):
+    """The ``q``-th percentile of ``values``, interpolated between samples."""
+    values = sorted(values)
+    if len(values) == 1:
+        return values[0]
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_mock(args, port):
+    """Start the mock API in a subprocess and wait until it answers."""
+    argv = [
+        sys.executable, str(Path(__file__).with_name("mock_api.py")), "--port", str(port),
+        "--bars", str(args.bars), "--ingredients", str(args.ingredients), "--cocktails", str(args.cocktails),
+        "--shelf", str(args.shelf), "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--page-size", str(args.page_size), "--max-page-size", str(args.max_page_size),
+        "--error-rate", str(args.error_rate), "--seed", str(args.seed),
+    ]
+    if not args.gzip:
+        argv.append("--no-gzip")
+    process = await asyncio.create_subprocess_exec(*argv)
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(f"http://127.0.0.1:{port}/_stats")
+                return process
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("The mock API did not start")
+
+
+async def run_scenario(session, kind, target, arguments, calls, concurrency):
+    """Run one scenario ``calls`` times and time every call.
+
+    The first call runs on its own, so its latency is the cold one; the
+    rest run with up to ``concurrency`` calls in flight.
+    """
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if kind == "tool":
+                    result = await session.call_tool(target, arguments)
+                    failed = result.isError or any(
+                        getattr(item, "text", "").startswith("Error") for item in result.content
+                    )
+                else:
+                    await session.read_resource(target)
+                    failed = False
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await call()
+    await asyncio.gather(*(call() for _ in range(calls - 1)))
+    elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+async def benchmark(args):
+    port = free_port()
+    mock = await start_mock(args, port)
+    env = {
+        **os.environ,
+        "BAR_ASSISTANT_API_URL": f"http://127.0.0.1:{port}/api",
+        "BAR_ASSISTANT_TOKEN": "benchmark",
+        "BAR_ASSISTANT_BAR_ID": "1",
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT / "src"), os.environ.get("PYTHONPATH")])),
+    }
+    env.pop("BAR_ASSISTANT_SNAPSHOT", None)
+    server = StdioServerParameters(command=sys.executable, args=["-m", "bar_assistant_mcp.server"], env=env)
+
+    results = []
+    errlog = sys.stderr if args.verbose else open(os.devnull, "w")
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as stats, \
+                stdio_client(server, errlog=errlog) as (read_stream, write_stream), \
+                ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            selected = [s for s in scenarios(args) if not args.only or any(o in s[0] for o in args.only)]
+            for label, kind, target, arguments in selected:
+                await stats.delete("/_stats")
+                latencies, errors, elapsed = await run_scenario(
+                    session, kind, target, arguments, args.calls, args.concurrency
+                )
+                upstream = (await stats.get("/_stats")).json()
+                results.append({
+                    "scenario": label,
+                    "calls": len(latencies),
+                    "errors": errors,
+                    "throughput": len(latencies) / elapsed,
+                    "first_ms": latencies[0] * 1000,
+                    "p50_ms": percentile(latencies, 50) * 1000,
+                    "p95_ms": percentile(latencies, 95) * 1000,
+                    "p99_ms": percentile(latencies, 99) * 1000,
+                    "api_requests": upstream["requests"],
+                    "api_errors": upstream["errors"],
+                    "api_endpoints": upstream["endpoints"],
+                })
+    finally:
+        if errlog is not sys.stderr:
+            errlog.close()
+        mock.terminate()
+        await mock.wait()
+    return results
+
+
+def format_table(results):
+    lines = [
+        "| Scenario | Calls | Errors | Calls/s | First ms | p50 ms | p95 ms | p99 ms | API requests |",
+        "|----------|------:|-------:|--------:|---------:|-------:|-------:|-------:|-------------:|",
+    ]
+    for r in results:
+        lines.append(
+            f"| {r['scenario']} | {r['calls']} | {r['errors']} | {r['throughput']:.1f} | {r['first_ms']:.1f} "
+            f"| {r['p50_ms']:.1f} | {r['p95_ms']:.1f} | {r['p99_ms']:.1f} | {r['api_requests']} |"
+        )
+    return "\n".join(lines)
+
+
+def regressions(results, baseline, tolerance):
+    """Describe scenarios that got slower or chattier than the baseline."""
+    previous = {r["scenario"]: r for r in baseline}
+    found = []
+    for r in results:
+        before = previous.get(r["scenario"])
+        if before is None:
+            continue
+        if r["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            found.append(f"{r['scenario']}: p95 {before['p95_ms']:.1f} ms -> {r['p95_ms']:.1f} ms")
+        if r["throughput"] < before["throughput"] * (1 - tolerance):
+            found.append(f"{r['scenario']}: {before['throughput']:.1f} -> {r['throughput']:.1f} calls/s")
+        if r["api_requests"] > before["api_requests"] * (1 + tolerance):
+            found.append(f"{r['scenario']}: {before['api_requests']} -> {r['api_requests']} API requests")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MCP server against a local mock Bar Assistant API")
+    parser.add_argument("--calls", type=int, default=50, help="Calls per scenario (default 50)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Calls in flight at once (default 1)")
+    parser.add_argument("--only", action="append", help="Run only scenarios whose name contains this (repeatable)")
+    parser.add_argument("--verbose", action="store_true", help="Show the server's log output")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="Fail if results regressed against an earlier --json file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression against the baseline (default 0.2)")
+    mock_api.add_arguments(parser)
+    args = parser.parse_args()
+    if args.calls < 1 or args.concurrency < 1:
+        parser.error("--calls and --concurrency must be at least 1")
+
+    results = asyncio.run(benchmark(args))
+    print(format_table(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        found = regressions(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if found:
+            print("\nRegressions:\n" + "\n".join(f"- {line}" for line in found))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""A local stand-in for the Bar Assistant API, for offline benchmarks.
+
+Serves generated bars, ingredients and cocktails over the endpoints the
+MCP server uses, with configurable latency, page sizes and error rates.
+Request counts per endpoint are kept in memory and served at ``/_stats``.
+
+Run it on its own with ``python benchmarks/mock_api.py --port 8000`` and
+point ``BAR_ASSISTANT_API_URL`` at ``http://127.0.0.1:8000/api``.
+"""
+
+import argparse
+import asyncio
+import random
+import re
+from datetime import datetime, timedelta, timezone
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+BASE_NAMES = [
+    "Gin", "Vodka", "White Rum", "Dark Rum", "Tequila", "Mezcal", "Bourbon", "Rye Whiskey",
+    "Scotch Whisky", "Cognac", "Triple Sec", "Cointreau", "Sweet Vermouth", "Dry Vermouth",
+    "Campari", "Aperol", "Angostura Bitters", "Orange Bitters", "Lime Juice", "Lemon Juice",
+    "Simple Syrup", "Honey Syrup", "Grenadine", "Crème de Cassis", "Maraschino Liqueur",
+    "Chartreuse", "Absinthe", "Soda Water", "Tonic Water", "Ginger Beer",
+]
+VARIANTS = ["", "Aged", "Spiced", "Overproof", "Barrel-Aged", "Infused", "Reserve", "Old Tom", "Navy", "Smoked"]
+
+_ID_RE = re.compile(r"/\d+(?=/|$)")
+
+
+def ingredient_name(i):
+    """Name of the ``i``-th generated ingredient; stable across runs."""
+    base = BASE_NAMES[i % len(BASE_NAMES)]
+    variant = VARIANTS[(i // len(BASE_NAMES)) % len(VARIANTS)]
+    round_ = i // (len(BASE_NAMES) * len(VARIANTS))
+    name = f"{variant} {base}".strip()
+    return f"{name} {round_ + 1}" if round_ else name
+
+
+class Catalog:
+    """A bar's generated ingredients, cocktails and shelf."""
+
+    def __init__(self, ingredients=500, cocktails=1000, shelf=80, seed=0):
+        rng = random.Random(seed)
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.clock = now
+        self.ingredients = {
+            i: {
+                "id": i,
+                "name": ingredient_name(i - 1),
+                "slug": ingredient_name(i - 1).lower().replace(" ", "-"),
+                "strength": rng.choice([0, 0, 15, 24, 40, 47]),
+                "description": f"Generated ingredient {i}.",
+                "updated_at": self.tick(),
+            }
+            for i in range(1, ingredients + 1)
+        }
+        # Most cocktails use common ingredients, so a realistic share of them is makeable
+        common = sorted(self.ingredients)[:max(2 * shelf, 10)]
+        self.cocktails = {}
+        for i in range(1, cocktails + 1):
+            pool = common if rng.random() < 0.8 else sorted(self.ingredients)
+            parts = rng.sample(pool, k=min(len(pool), rng.randint(2, 5)))
+            self.cocktails[i] = self.make_cocktail(i, {
+                "name": f"Cocktail {i}",
+                "instructions": "Shake with ice and strain.",
+                "ingredients": [
+                    {"ingredient_id": ing_id, "amount": rng.choice([15, 22.5, 30, 45, 60]), "units": "ml"}
+                    for ing_id in parts
+                ],
+            })
+        self.shelf = set(sorted(self.ingredients)[:min(shelf, len(self.ingredients))])
+
+    def tick(self):
+        self.clock += timedelta(seconds=1)
+        return self.clock.isoformat()
+
+    def make_cocktail(self, cocktail_id, payload):
+        ingredients = [
+            {
+                "ingredient": {"id": part["ingredient_id"], "name": self.ingredients.get(part["ingredient_id"], {}).get("name")},
+                "amount": part.get("amount"),
+                "units": part.get("units"),
+            }
+            for part in payload.get("ingredients", [])
+        ]
+        return {
+            **{key: value for key, value in payload.items() if key != "ingredients"},
+            "id": cocktail_id,
+            "slug": str(payload.get("name", "")).lower().replace(" ", "-"),
+            "short_ingredients": [part["ingredient"]["name"] for part in ingredients],
+            "ingredients": ingredients,
+            "updated_at": self.tick(),
+        }
+
+    def makeable(self):
+        return [
+            cocktail for cocktail in self.cocktails.values()
+            if all(part["ingredient"]["id"] in self.shelf for part in cocktail["ingredients"])
+        ]
+
+
+class MockAPI:
+    """The mock's state: one catalog per bar, settings and request counts."""
+
+    def __init__(self, bars=2, ingredients=500, cocktails=1000, shelf=80, latency=0.0, jitter=0.0,
+                 page_size=25, max_page_size=100, error_rate=0.0, gzip=True, seed=0):
+        self.bars = [{"id": i, "name": f"Bar {i}", "slug": f"bar-{i}"} for i in range(1, bars + 1)]
+        self.sizes = (ingredients, cocktails, shelf)
+        self.catalogs = {}
+        self.latency = latency
+        self.jitter = jitter
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.error_rate = error_rate
+        self.gzip = gzip
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.requests = {}
+        self.errors = 0
+
+    def catalog(self, bar_id):
+        catalog = self.catalogs.get(bar_id)
+        if catalog is None:
+            catalog = self.catalogs[bar_id] = Catalog(*self.sizes, seed=self.seed + bar_id)
+        return catalog
+
+    def stats(self):
+        return {
+            "requests": sum(self.requests.values()),
+            "errors": self.errors,
+            "endpoints": dict(sorted(self.requests.items())),
+        }
+
+    def page(self, request, records):
+        """Paginate records like Laravel, honouring ``per_page`` up to the maximum."""
+        params = request.query_params
+        per_page = min(int(params.get("per_page", self.page_size)), self.max_page_size)
+        page = max(1, int(params.get("page", 1)))
+        last_page = max(1, -(-len(records) // per_page))
+        return {
+            "data": records[(page - 1) * per_page:page * per_page],
+            "meta": {"current_page": page, "last_page": last_page, "per_page": per_page, "total": len(records)},
+        }
+
+    def app(self):
+        async def handle(request):
+            label = f"{request.method} {_ID_RE.sub('/{id}', request.url.path)}"
+            self.requests[label] = self.requests.get(label, 0) + 1
+            if self.latency or self.jitter:
+                await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.errors += 1
+                return JSONResponse({"message": "Service Unavailable"}, status_code=503)
+            return await route(request)
+
+        async def stats(request):
+            if request.method == "DELETE":
+                self.requests.clear()
+                self.errors = 0
+            return JSONResponse(self.stats())
+
+        app = Starlette(routes=[
+            Route("/_stats", endpoint=stats, methods=["GET", "DELETE"]),
+            Route("/api/{path:path}", endpoint=handle, methods=["GET", "POST", "PUT", "DELETE"]),
+        ], middleware=[Middleware(GZipMiddleware)] if self.gzip else [])
+        app.state.api = self
+        return app
+
+
+def _sorted(records, sort):
+    if sort:
+        key = sort.lstrip("-")
+        records = sorted(records, key=lambda record: (record.get(key) is None, record.get(key)), reverse=sort.startswith("-"))
+    return records
+
+
+async def route(request):
+    api = request.app.state.api
+    path = request.path_params["path"].strip("/").split("/")
+    params = request.query_params
+    bar_id = int(request.headers.get("Bar-Assistant-Bar-Id") or 1)
+
+    if path == ["bars"] and request.method == "GET":
+        return JSONResponse({"data": api.bars})
+
+    if path[0] == "bars" and len(path) >= 3:
+        catalog = api.catalog(int(path[1]))
+        if path[2] == "cocktails" and request.method == "GET":
+            return JSONResponse(api.page(request, _sorted(catalog.makeable(), params.get("sort"))))
+        if path[2:] == ["ingredients", "batch-store"]:
+            catalog.shelf.update((await request.json()).get("ingredients", []))
+            return JSONResponse({"data": []})
+        if path[2:] == ["ingredients", "batch-delete"]:
+            catalog.shelf.difference_update((await request.json()).get("ingredients", []))
+            return JSONResponse({"data": []})
+
+    catalog = api.catalog(bar_id)
+
+    if path == ["ingredients"]:
+        if request.method == "POST":
+            payload = await request.json()
+            ingredient_id = max(catalog.ingredients, default=0) + 1
+            ingredient = catalog.ingredients[ingredient_id] = {**payload, "id": ingredient_id, "updated_at": catalog.tick()}
+            return JSONResponse({"data": ingredient}, status_code=201)
+        records = list(catalog.ingredients.values())
+        if params.get("filter[bar_shelf]"):
+            records = [ing for ing in records if ing["id"] in catalog.shelf]
+        if params.get("filter[name]"):
+            query = params["filter[name]"].lower()
+            records = [ing for ing in records if query in ing["name"].lower()]
+        return JSONResponse(api.page(request, _sorted(records, params.get("sort"))))
+
+    if path[0] == "cocktails":
+        if len(path) == 1 and request.method == "POST":
+            cocktail_id = max(catalog.cocktails, default=0) + 1
+            cocktail = catalog.cocktails[cocktail_id] = catalog.make_cocktail(cocktail_id, await request.json())
+            return JSONResponse({"data": cocktail}, status_code=201)
+        if len(path) == 1:
+            records = list(catalog.cocktails.values())
+            if params.get("filter[id]"):
+                ids = {int(id) for id in params["filter[id]"].split(",")}
+                records = [cocktail for cocktail in records if cocktail["id"] in ids]
+            return JSONResponse(api.page(request, _sorted(records, params.get("sort"))))
+        cocktail_id = int(path[1])
+        if cocktail_id not in catalog.cocktails:
+            return JSONResponse({"message": "Not found"}, status_code=404)
+        if request.method == "PUT":
+            catalog.cocktails[cocktail_id] = catalog.make_cocktail(cocktail_id, await request.json())
+        return JSONResponse({"data": catalog.cocktails[cocktail_id]})
+
+    return JSONResponse({"message": "Not found"}, status_code=404)
+
+
+def add_arguments(parser):
+    """Add the mock's settings to an argument parser."""
+    group = parser.add_argument_group("mock API")
+    group.add_argument("--bars", type=int, default=2, help="Number of bars (default 2)")
+    group.add_argument("--ingredients", type=int, default=500, help="Ingredients per bar (default 500)")
+    group.add_argument("--cocktails", type=int, default=1000, help="Cocktails per bar (default 1000)")
+    group.add_argument("--shelf", type=int, default=80, help="Ingredients on each shelf (default 80)")
+    group.add_argument("--latency", type=float, default=20.0, help="Response latency in ms (default 20)")
+    group.add_argument("--jitter", type=float, default=5.0, help="Extra random latency of up to this many ms (default 5)")
+    group.add_argument("--page-size", type=int, default=25, help="Default page size (default 25)")
+    group.add_argument("--max-page-size", type=int, default=100, help="Largest page size honoured (default 100)")
+    group.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503 (default 0)")
+    group.add_argument("--no-gzip", dest="gzip", action="store_false", help="Don't gzip responses, which are gzipped like a real API's by default")
+    group.add_argument("--seed", type=int, default=0, help="Seed for generated data, latency and errors")
+
+
+def create_api(args):
+    """Build the mock API from parsed arguments."""
+    return MockAPI(
+        bars=args.bars,
+        ingredients=args.ingredients,
+        cocktails=args.cocktails,
+        shelf=args.shelf,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        page_size=args.page_size,
+        max_page_size=args.max_page_size,
+        error_rate=args.error_rate,
+        gzip=args.gzip,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Bar Assistant API for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(create_api(args).app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
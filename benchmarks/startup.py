@@ -0,0 +1,135 @@
+"""Measure how long the MCP server takes to start.
+
+Every conversation spawns a fresh stdio server, so startup is paid each
+time. For every run this reports:
+
+- the import time of the ``mcp`` SDK and of the server module itself
+- the time from spawning the server to its ``initialize`` response
+- the time from there to the first ``tools/list`` response
+
+    python benchmarks/startup.py --runs 20 --json startup.json
+    python benchmarks/startup.py --baseline startup.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from bench import ROOT, percentile
+
+
+MEASURE_IMPORTS = """
+import json, time
+started = time.perf_counter()
+import mcp.server.lowlevel, mcp.server.stdio
+sdk = time.perf_counter()
+import bar_assistant_mcp.server
+done = time.perf_counter()
+print(json.dumps({"import_sdk_ms": (sdk - started) * 1000, "import_server_ms": (done - sdk) * 1000}))
+"""
+
+METRICS = ("import_sdk_ms", "import_server_ms", "initialize_ms", "tools_list_ms")
+# Slowdowns smaller than this are noise, whatever the tolerance
+NOISE_MS = 5.0
+
+
+def server_env():
+    return {
+        **os.environ,
+        # Nothing listens here; startup must not depend on the API
+        "BAR_ASSISTANT_API_URL": "http://127.0.0.1:9/api",
+        "BAR_ASSISTANT_TOKEN": "startup",
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT / "src"), os.environ.get("PYTHONPATH")])),
+    }
+
+
+async def measure_imports(env):
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", MEASURE_IMPORTS, env=env, stdout=asyncio.subprocess.PIPE
+    )
+    stdout, _ = await process.communicate()
+    return json.loads(stdout)
+
+
+async def measure_initialize(env):
+    """Time a stdio server's answers to ``initialize`` and the first ``tools/list``."""
+    started = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "bar_assistant_mcp.server", env=env,
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+    )
+
+    async def send(message):
+        process.stdin.write(json.dumps({"jsonrpc": "2.0", **message}).encode() + b"\n")
+        await process.stdin.drain()
+
+    try:
+        await send({"id": 1, "method": "initialize", "params": {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "startup-benchmark", "version": "1"},
+        }})
+        await process.stdout.readline()
+        initialized = time.perf_counter()
+        await send({"method": "notifications/initialized"})
+        await send({"id": 2, "method": "tools/list"})
+        await process.stdout.readline()
+        listed = time.perf_counter()
+    finally:
+        process.kill()
+        await process.wait()
+    return {"initialize_ms": (initialized - started) * 1000, "tools_list_ms": (listed - initialized) * 1000}
+
+
+async def measure(runs):
+    env = server_env()
+    samples = []
+    for _ in range(runs):
+        samples.append({**await measure_imports(env), **await measure_initialize(env)})
+    return {
+        metric: {
+            "p50": percentile([s[metric] for s in samples], 50),
+            "p95": percentile([s[metric] for s in samples], 95),
+        }
+        for metric in METRICS
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the MCP server's startup time")
+    parser.add_argument("--runs", type=int, default=10, help="Server starts to measure (default 10)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="Fail if startup got slower than an earlier --json file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression against the baseline (default 0.2)")
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    results = asyncio.run(measure(args.runs))
+    lines = ["| Measurement | p50 ms | p95 ms |", "|-------------|-------:|-------:|"]
+    lines += [f"| {metric[:-3]} | {r['p50']:.1f} | {r['p95']:.1f} |" for metric, r in results.items()]
+    print("\n".join(lines))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        found = [
+            f"{metric[:-3]}: p50 {baseline[metric]['p50']:.1f} ms -> {r['p50']:.1f} ms"
+            for metric, r in results.items()
+            # The SDK's import time isn't ours to guard
+            if metric != "import_sdk_ms" and metric in baseline
+            and r["p50"] > baseline[metric]["p50"] * (1 + args.tolerance)
+            and r["p50"] - baseline[metric]["p50"] > NOISE_MS
+        ]
+        if found:
+            print("\nRegressions:\n" + "\n".join(f"- {line}" for line in found))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
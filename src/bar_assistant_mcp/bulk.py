@@ -0,0 +1,59 @@
+"""Helpers for importing many cocktail recipes at once."""
+
+import asyncio
+import json
+
+import httpx
+
+from .ratelimit import TokenBucket
+
+
+def parse_recipes(text):
+    """Parse recipes given as a JSON array, a single JSON object or JSONL."""
+    text = text.strip()
+    if not text:
+        return []
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        data = data.get("cocktails", [data])
+    return list(data)
+
+
+def ingredient_names(recipes):
+    """Collect the ingredient names that still need to be resolved to IDs."""
+    names = {}
+    for recipe in recipes:
+        for ing in recipe.get("ingredients", []):
+            if ing.get("ingredient_id") is None and ing.get("name"):
+                names[ing["name"]] = None
+    return list(names)
+
+
+async def submit_all(items, submit, concurrency=4, rate=5.0):
+    """Run ``submit(item)`` for every item concurrently, with pacing.
+
+    Returns a list of ``(ok, result_or_error)`` pairs in the order of
+    ``items``. Transient HTTP failures are already retried by the client,
+    so any error raised here fails the item.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    pacer = TokenBucket(rate)
+
+    async def run(item):
+        async with semaphore:
+            await pacer.acquire()
+            try:
+                return True, await submit(item)
+            except httpx.HTTPStatusError as e:
+                return False, f"HTTP {e.response.status_code}: {e.response.text[:200]}"
+            except httpx.HTTPError as e:
+                return False, f"{type(e).__name__}: {e}"
+            except KeyError as e:
+                return False, f"missing field {e}"
+            except ValueError as e:
+                return False, str(e)
+
+    return await asyncio.gather(*(run(item) for item in items))
@@ -0,0 +1,215 @@
+"""In-process response cache for read-only Bar Assistant endpoints."""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+
+import httpx
+
+
+# Time-to-live in seconds for each cacheable endpoint, matched against the
+# end of the request path. Endpoints not listed here are never cached.
+DEFAULT_TTLS = [
+    (r"/bars", 300),
+    (r"/bars/\d+/cocktails", 60),
+    (r"/ingredients", 60),
+    (r"/ingredients/\d+", 120),
+    (r"/cocktails", 60),
+    (r"/cocktails/\d+", 120),
+    (r"/glasses", 3600),
+    (r"/methods", 3600),
+]
+
+
+class CacheEntry:
+    """A cached response body with its freshness and validators."""
+
+    __slots__ = ("status_code", "headers", "content", "expires_at", "etag", "last_modified", "size")
+
+    def __init__(self, status_code, headers, content, ttl):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.expires_at = time.monotonic() + ttl
+        self.etag = headers.get("etag")
+        self.last_modified = headers.get("last-modified")
+        self.size = len(content) + sum(len(k) + len(v) for k, v in headers.items())
+
+    @property
+    def fresh(self):
+        return time.monotonic() < self.expires_at
+
+    def to_response(self, request):
+        return httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=request,
+        )
+
+
+class ResponseCache:
+    """LRU cache of API responses with per-endpoint TTLs and a memory cap."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttls=None):
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(pattern + "$"), ttl) for pattern, ttl in (ttls or DEFAULT_TTLS)]
+        self.entries: OrderedDict[tuple, CacheEntry] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        # Bumped on every invalidation so in-flight reads don't store stale data
+        self.generation = 0
+
+    def ttl_for(self, path):
+        """Get the TTL for a request path, or 0 if it should not be cached."""
+        ttl = 0
+        for pattern, pattern_ttl in self.ttls:
+            if pattern.search(path):
+                ttl = pattern_ttl
+        return ttl
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry):
+        if entry.size > self.max_bytes:
+            return
+        self.discard(key)
+        self.entries[key] = entry
+        self.size += entry.size
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.size
+
+    def lookup(self, request):
+        """Get the decoded body of a GET request's fresh cached response, or None."""
+        entry = self.get(cache_key(request))
+        if entry is None or not entry.fresh:
+            return None
+        self.hits += 1
+        # Entries keep the body as the API sent it, which may be compressed
+        return entry.to_response(request).content
+
+    def store(self, request, content, generation=None):
+        """Cache a body as the response to a GET request that wasn't sent.
+
+        Used for records taken from a batched response, so a later request
+        for one of them is answered from the cache. Nothing is stored if
+        the cache was invalidated since ``generation``.
+        """
+        ttl = self.ttl_for(request.url.path)
+        if not ttl or (generation is not None and generation != self.generation):
+            return
+        headers = httpx.Headers({"content-type": "application/json"})
+        self.set(cache_key(request), CacheEntry(200, headers, content, ttl))
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def invalidate(self, *patterns, bar_id=None):
+        """Drop cached entries whose path matches any of the given patterns.
+
+        When ``bar_id`` is given only entries for that bar (or with no bar
+        context) are dropped; entries for other bars stay cached.
+        """
+        compiled = [re.compile(pattern + "$") for pattern in patterns]
+        bar = str(int(bar_id)) if bar_id else None
+        stale = [
+            key for key in self.entries
+            if any(pattern.search(key[1]) for pattern in compiled)
+            and (bar is None or key[3] in (bar, None))
+        ]
+        for key in stale:
+            self.discard(key)
+        self.generation += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+        self.generation += 1
+
+
+def cache_key(request):
+    """Build the cache key for a request: (endpoint, params, bar ID, credentials)."""
+    params = tuple(sorted(request.url.params.multi_items()))
+    bar_id = request.headers.get("bar-assistant-bar-id")
+    # Hash the credentials so responses are never shared between tokens
+    auth = request.headers.get("authorization", "")
+    auth_hash = hashlib.sha256(auth.encode()).hexdigest()[:16] if auth else ""
+    return (request.url.host, request.url.path, params, bar_id, auth_hash)
+
+
+async def read_raw(response):
+    """Read a response body without decoding it, so it can be replayed later."""
+    if response.is_stream_consumed:
+        # Body was already loaded into memory when the response was built.
+        # Its stream still holds it as it was given, before any decoding.
+        if isinstance(response.stream, httpx.ByteStream):
+            return b"".join(response.stream)
+        return response.content
+    try:
+        return b"".join([chunk async for chunk in response.aiter_raw()])
+    finally:
+        await response.aclose()
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """Transport that answers cacheable GET requests from a ResponseCache.
+
+    Expired entries that carry an ``ETag`` or ``Last-Modified`` header are
+    revalidated with a conditional request instead of being refetched.
+    """
+
+    def __init__(self, transport, cache):
+        self._transport = transport
+        self._cache = cache
+
+    async def handle_async_request(self, request):
+        if request.method != "GET":
+            return await self._transport.handle_async_request(request)
+
+        ttl = self._cache.ttl_for(request.url.path)
+        if not ttl:
+            return await self._transport.handle_async_request(request)
+
+        key = cache_key(request)
+        entry = self._cache.get(key)
+        if entry is not None and entry.fresh:
+            self._cache.hits += 1
+            return entry.to_response(request)
+
+        if entry is not None:
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+
+        generation = self._cache.generation
+        response = await self._transport.handle_async_request(request)
+
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            self._cache.revalidations += 1
+            entry.expires_at = time.monotonic() + ttl
+            return entry.to_response(request)
+
+        self._cache.misses += 1
+        if response.status_code != 200 or "no-store" in response.headers.get("cache-control", ""):
+            return response
+
+        content = await read_raw(response)
+        entry = CacheEntry(response.status_code, response.headers, content, ttl)
+        if generation == self._cache.generation:
+            self._cache.set(key, entry)
+        return entry.to_response(request)
+
+    async def aclose(self):
+        await self._transport.aclose()
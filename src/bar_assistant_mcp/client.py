@@ -0,0 +1,140 @@
+"""Shared HTTP client for talking to the Bar Assistant API."""
+
+import asyncio
+
+import httpx
+
+from .cache import CachingTransport
+from .metrics import MetricsTransport
+from .ratelimit import RateLimitTransport
+from .retry import RetryTransport
+from .singleflight import SingleFlightTransport
+from .tracing import TracingTransport, record_retry
+
+
+def create_client(config, cache=None, limiter=None, flight=None, metrics=None, tracing=False) -> httpx.AsyncClient:
+    """Create the pooled HTTP client used for the whole server lifetime.
+
+    Connections are kept alive between tool calls so that only the first
+    request to the Bar Assistant instance pays for the TCP/TLS handshake.
+    Transient failures are retried with backoff. When a ``limiter`` is
+    given, every attempt waits for the host's request budget. When a
+    ``flight`` is given, identical concurrent GET requests share a single
+    upstream response, and when a ``cache`` is given, read-only requests
+    are answered from it. When ``metrics`` are given, requests are timed
+    as the tools see them and counted as they reach the API. With
+    ``tracing``, every request gets a client span with retries as events.
+    """
+    if config["http2"]:
+        try:
+            import h2  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError(
+                "HTTP/2 support requires the 'h2' package. "
+                "Install it with: pip install 'bar-assistant-mcp[http2]'"
+            ) from e
+
+    limits = httpx.Limits(
+        max_connections=config["max_connections"],
+        max_keepalive_connections=config["max_keepalive_connections"],
+        keepalive_expiry=config["keepalive_expiry"],
+    )
+    transport = httpx.AsyncHTTPTransport(limits=limits, http2=config["http2"])
+    if metrics is not None:
+        transport = MetricsTransport(transport, metrics, upstream=True)
+    if limiter is not None:
+        transport = RateLimitTransport(transport, limiter)
+    def on_retry(request):
+        if metrics is not None:
+            metrics.retried(request)
+        if tracing:
+            record_retry(request)
+
+    transport = RetryTransport(
+        transport,
+        retries=config["retries"],
+        backoff=config["retry_backoff"],
+        max_delay=config["retry_max_delay"],
+        on_retry=on_retry,
+    )
+    if flight is not None:
+        transport = SingleFlightTransport(transport, flight)
+    if cache is not None:
+        transport = CachingTransport(transport, cache)
+    if metrics is not None:
+        transport = MetricsTransport(transport, metrics)
+    if tracing:
+        transport = TracingTransport(transport)
+    return httpx.AsyncClient(transport=transport)
+
+
+async def fetch_all_pages(client, url, headers=None, params=None, concurrency=4) -> list:
+    """Fetch every page of a paginated listing and merge the results in order.
+
+    The first page is requested on its own to read ``meta.last_page``; the
+    remaining pages are then fetched concurrently, with at most
+    ``concurrency`` requests in flight at once.
+    """
+    params = dict(params or {})
+    params.pop("page", None)
+
+    response = await client.get(url, headers=headers, params=params)
+    response.raise_for_status()
+    data = response.json()
+
+    items = list(data.get("data", []))
+    last_page = int((data.get("meta") or {}).get("last_page") or 1)
+    if last_page <= 1:
+        return items
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch_page(page):
+        async with semaphore:
+            response = await client.get(url, headers=headers, params={**params, "page": page})
+            response.raise_for_status()
+            return response.json().get("data", [])
+
+    pages = await asyncio.gather(*(fetch_page(page) for page in range(2, last_page + 1)))
+    for page_items in pages:
+        items.extend(page_items)
+    return items
+
+
+async def fetch_window(client, url, offset, limit, headers=None, params=None, concurrency=4, max_per_page=100):
+    """Fetch ``limit`` records starting at ``offset`` from a paginated listing.
+
+    Only the pages overlapping the window are requested, using a page size
+    close to ``limit``. Returns ``(records, total)``, or ``(None, None)``
+    if the API didn't honor the requested page size.
+    """
+    params = dict(params or {})
+    params.pop("page", None)
+    per_page = max(1, min(limit, max_per_page))
+    first_page = offset // per_page + 1
+    last_page = (offset + limit - 1) // per_page + 1
+
+    response = await client.get(url, headers=headers, params={**params, "per_page": per_page, "page": first_page})
+    response.raise_for_status()
+    data = response.json()
+    meta = data.get("meta") or {}
+    if int(meta.get("per_page") or per_page) != per_page:
+        return None, None
+
+    items = list(data.get("data", []))
+    total = int(meta.get("total") or len(items))
+    last_page = min(last_page, int(meta.get("last_page") or first_page))
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch_page(page):
+        async with semaphore:
+            response = await client.get(url, headers=headers, params={**params, "per_page": per_page, "page": page})
+            response.raise_for_status()
+            return response.json().get("data", [])
+
+    pages = await asyncio.gather(*(fetch_page(page) for page in range(first_page + 1, last_page + 1)))
+    for page_items in pages:
+        items.extend(page_items)
+    skip = offset - (first_page - 1) * per_page
+    return items[skip:skip + limit], total
@@ -0,0 +1,158 @@
+"""Local in-memory index of a bar's ingredient catalog."""
+
+import bisect
+import re
+import time
+import unicodedata
+
+from .matching import FuzzyMatcher
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Normalize text for matching: case-folded, accents stripped."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+def tokenize(text):
+    """Split normalized text into word tokens."""
+    return _TOKEN_RE.findall(text)
+
+
+class IngredientIndex:
+    """Ingredient catalog indexed for prefix, token and substring search.
+
+    Names are normalized once when the catalog is loaded, so lookups are
+    case- and accent-insensitive without any per-query work on the catalog.
+    """
+
+    def __init__(self):
+        self.ingredients: dict[int, dict] = {}
+        self.names: dict[int, str] = {}
+        self._sorted_names: list[tuple[str, int]] = []
+        self._sorted_tokens: list[tuple[str, int]] = []
+        self._exact: dict[str, int] = {}
+        self._matcher = FuzzyMatcher({})
+        self.loaded_at = None
+
+    def __len__(self):
+        return len(self.ingredients)
+
+    @property
+    def ready(self):
+        return self.loaded_at is not None
+
+    def load(self, ingredients):
+        """Replace the indexed catalog with a full list of ingredients."""
+        self.ingredients = {}
+        self.names = {}
+        for ingredient in ingredients:
+            self._store(ingredient)
+        self._rebuild()
+        self.loaded_at = time.monotonic()
+
+    def add(self, ingredient):
+        """Add or replace a single ingredient, e.g. after it was created."""
+        self.upsert([ingredient])
+
+    def upsert(self, ingredients):
+        """Add or replace several ingredients, e.g. from an incremental sync."""
+        for ingredient in ingredients:
+            self._store(ingredient)
+        self._rebuild()
+
+    def _store(self, ingredient):
+        self.ingredients[ingredient["id"]] = ingredient
+        self.names[ingredient["id"]] = normalize(ingredient.get("name") or "")
+
+    def _rebuild(self):
+        self._sorted_names = sorted((name, id) for id, name in self.names.items())
+        self._exact = {}
+        for name, id in self._sorted_names:
+            self._exact.setdefault(name, id)
+        self._sorted_tokens = sorted(
+            (token, id) for id, name in self.names.items() for token in set(tokenize(name))
+        )
+        self._matcher = FuzzyMatcher(self.names)
+
+    @staticmethod
+    def _prefixed(sorted_pairs, prefix):
+        """Yield IDs whose key starts with prefix from a sorted (key, id) list."""
+        start = bisect.bisect_left(sorted_pairs, (prefix,))
+        for key, id in sorted_pairs[start:]:
+            if not key.startswith(prefix):
+                break
+            yield id
+
+    def search(self, query, limit=50):
+        """Find ingredients matching a name query.
+
+        Results are ordered by relevance: exact matches first, then names
+        starting with the query, then names where every query word starts
+        a word of the name, then any other name containing the query.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        found: dict[int, None] = {}
+
+        for id in self._prefixed(self._sorted_names, query):
+            if self.names[id] == query:
+                found[id] = None
+        for id in self._prefixed(self._sorted_names, query):
+            found.setdefault(id)
+
+        tokens = tokenize(query)
+        if tokens:
+            candidates = set(self._prefixed(self._sorted_tokens, tokens[0]))
+            for token in tokens[1:]:
+                candidates &= set(self._prefixed(self._sorted_tokens, token))
+            for id in sorted(candidates, key=self.names.__getitem__):
+                found.setdefault(id)
+
+        if len(found) < limit:
+            for name, id in self._sorted_names:
+                if query in name:
+                    found.setdefault(id)
+
+        return [self.ingredients[id] for id in list(found)[:limit]]
+
+    def match(self, query, limit=10, min_score=0.3):
+        """Find the ingredients closest to a possibly misspelled name.
+
+        Returns (ingredient, score) pairs ranked best first, with scores
+        between 0 and 1.
+        """
+        return [
+            (self.ingredients[id], score)
+            for id, score in self._matcher.match(normalize(query), limit, min_score)
+        ]
+
+    def resolve(self, name, min_score=0.5):
+        """Resolve a name to a single ingredient where that is unambiguous.
+
+        Returns a ``(status, candidates)`` pair where status is
+        ``"resolved"`` (one candidate), ``"ambiguous"`` (several plausible
+        candidates, or only approximate matches) or ``"missing"``.
+        """
+        query = normalize(name)
+        exact = self._exact.get(query)
+        if exact is not None:
+            return "resolved", [self.ingredients[exact]]
+
+        # A lone hit only counts when the name is the start of it, so that
+        # "angostura bitter" resolves but "juice" doesn't pick "Lime Juice"
+        found = self.search(name, limit=5)
+        if len(found) == 1 and self.names[found[0]["id"]].startswith(query):
+            return "resolved", found
+        if found:
+            return "ambiguous", found
+
+        matches = self.match(name, limit=5, min_score=min_score)
+        if matches:
+            return "ambiguous", [ingredient for ingredient, _ in matches]
+        return "missing", []
@@ -0,0 +1,92 @@
+"""Field projection, sorting and cursor pagination for listing results."""
+
+import base64
+import binascii
+import json
+
+
+def parse_fields(value):
+    """Parse a ``fields`` argument given as a list or comma-separated string."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    fields = [field.strip() for field in value if field and field.strip()]
+    return fields or None
+
+
+def project(record, fields):
+    """Keep only the ID and the given fields of a record."""
+    return {key: record[key] for key in dict.fromkeys(["id", *fields]) if key in record}
+
+
+def _sort_key(field):
+    def key(record):
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.casefold()
+        return (value is None, value if value is not None else 0)
+    return key
+
+
+def parse_sort(sort):
+    """Split a sort like ``-name`` into the field and whether it is descending."""
+    return sort.lstrip("-"), sort.startswith("-")
+
+
+def sort_records(records, sort):
+    field, descending = parse_sort(sort)
+    return sorted(records, key=_sort_key(field), reverse=descending)
+
+
+def is_sorted(records, sort):
+    """Check whether records already come in the order of ``sort``."""
+    field, descending = parse_sort(sort)
+    keys = [_sort_key(field)(record) for record in records]
+    try:
+        pairs = zip(keys, keys[1:])
+        return all(b <= a for a, b in pairs) if descending else all(a <= b for a, b in pairs)
+    except TypeError:
+        return False
+
+
+def encode_cursor(offset, limit, sort=None):
+    """Encode where the next window of a listing starts, and its size."""
+    state = {"offset": offset, "limit": limit}
+    if sort:
+        state["sort"] = sort
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {"offset": int(state["offset"]), "limit": state.get("limit"), "sort": state.get("sort")}
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def window(options, max_results):
+    """Get the ``(offset, limit, sort)`` requested by listing options.
+
+    A ``cursor`` from a previous result takes precedence over ``offset``
+    and carries the window size and sort order over. ``limit`` is capped
+    at ``max_results``.
+    """
+    cursor = decode_cursor(options["cursor"]) if options.get("cursor") else {}
+    offset = cursor["offset"] if cursor else int(options.get("offset") or 0)
+    limit = min(int(options.get("limit") or cursor.get("limit") or max_results), max_results)
+    sort = options.get("sort") or cursor.get("sort")
+    return max(0, offset), max(1, limit), sort
+
+
+def is_windowed(options):
+    """Check whether listing options ask for anything but the default page."""
+    return any(options.get(key) for key in ("limit", "offset", "cursor", "sort"))
+
+
+def next_cursor(offset, limit, count, total, sort=None):
+    """Get the cursor of the window after this one, or None at the end."""
+    if count and offset + count < total:
+        return encode_cursor(offset + count, limit, sort)
+    return None
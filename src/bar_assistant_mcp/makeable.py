@@ -0,0 +1,94 @@
+"""Local engine answering "what can I make" questions from shelf and recipes."""
+
+from collections import Counter
+
+
+def required_ingredient_ids(cocktail):
+    """Get the IDs of a cocktail's non-optional ingredients."""
+    ids = set()
+    for ing in cocktail.get("ingredients") or []:
+        if ing.get("optional"):
+            continue
+        ingredient_id = (ing.get("ingredient") or {}).get("id", ing.get("ingredient_id"))
+        if ingredient_id is not None:
+            ids.add(int(ingredient_id))
+    return ids
+
+
+class MakeableEngine:
+    """Cocktail and shelf state kept as bitsets for in-memory queries.
+
+    Each ingredient ID is assigned a bit; a cocktail is the mask of its
+    required ingredients and the shelf is the mask of what is on hand, so a
+    cocktail is makeable when ``mask & ~shelf == 0``. Matching is by exact
+    ingredient ID only: unlike the API it does not consider parent
+    ingredients or substitutes.
+    """
+
+    def __init__(self):
+        self._bits: dict[int, int] = {}
+        self._ids: list[int] = []
+        self.cocktails: dict[int, tuple[str, int]] = {}
+        self.shelf = 0
+
+    def _mask(self, ingredient_ids):
+        mask = 0
+        for ingredient_id in ingredient_ids:
+            bit = self._bits.get(ingredient_id)
+            if bit is None:
+                bit = self._bits[ingredient_id] = len(self._ids)
+                self._ids.append(ingredient_id)
+            mask |= 1 << bit
+        return mask
+
+    def load(self, cocktails, shelf_ids):
+        """Replace all state with a full cocktail list and shelf."""
+        self.cocktails = {}
+        for cocktail in cocktails:
+            self.set_cocktail(cocktail)
+        self.set_shelf(shelf_ids)
+
+    def set_cocktail(self, cocktail):
+        """Add or replace a cocktail, e.g. after it was created or updated."""
+        self.cocktails[int(cocktail["id"])] = (
+            cocktail.get("name", ""),
+            self._mask(required_ingredient_ids(cocktail)),
+        )
+
+    def set_shelf(self, ingredient_ids):
+        self.shelf = self._mask(int(id) for id in ingredient_ids)
+
+    def add_to_shelf(self, ingredient_ids):
+        self.shelf |= self._mask(int(id) for id in ingredient_ids)
+
+    def remove_from_shelf(self, ingredient_ids):
+        self.shelf &= ~self._mask(int(id) for id in ingredient_ids)
+
+    def _missing(self, extra_ids=()):
+        """Yield (cocktail_id, name, missing_mask) for every cocktail."""
+        shelf = self.shelf | self._mask(extra_ids)
+        for cocktail_id, (name, mask) in self.cocktails.items():
+            yield cocktail_id, name, mask & ~shelf
+
+    def makeable(self, extra_ids=()):
+        """Get (id, name) of cocktails makeable now, or with extra ingredients."""
+        return sorted(
+            ((cocktail_id, name) for cocktail_id, name, missing in self._missing(extra_ids) if not missing),
+            key=lambda item: item[1]
+        )
+
+    def missing_one(self, extra_ids=()):
+        """Get (id, name, missing_ingredient_id) of cocktails one ingredient short."""
+        result = []
+        for cocktail_id, name, missing in self._missing(extra_ids):
+            if missing and not missing & (missing - 1):
+                result.append((cocktail_id, name, self._ids[missing.bit_length() - 1]))
+        return sorted(result, key=lambda item: item[1])
+
+    def next_purchases(self, limit=10, extra_ids=()):
+        """Rank ingredients by how many new cocktails buying each would unlock.
+
+        Returns (ingredient_id, unlocked_count) pairs, best first.
+        """
+        unlocks = Counter(ingredient_id for _, _, ingredient_id in self.missing_one(extra_ids))
+        return sorted(unlocks.items(), key=lambda item: (-item[1], item[0]))[:limit]
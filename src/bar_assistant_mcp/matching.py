@@ -0,0 +1,57 @@
+"""Typo-tolerant name matching based on character trigrams."""
+
+from collections import defaultdict
+
+
+def trigrams(text):
+    """Get the set of character trigrams of each word in normalized text."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FuzzyMatcher:
+    """Rank names by trigram similarity to a query.
+
+    The score blends how similar the two names are overall (Dice
+    coefficient) with how much of the candidate name appears in the query,
+    so that both misspellings ("angostura bitter") and queries naming more
+    than one thing ("Cointreau triple sec") find the right candidates.
+    """
+
+    def __init__(self, names):
+        self._grams: dict[int, set[str]] = {}
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        for id, name in names.items():
+            grams = trigrams(name)
+            self._grams[id] = grams
+            for gram in grams:
+                self._postings[gram].append(id)
+
+    def match(self, query, limit=10, min_score=0.3):
+        """Get up to ``limit`` (id, score) pairs, best match first.
+
+        ``query`` must already be normalized the same way as the names.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        shared: dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for id in self._postings.get(gram, ()):
+                shared[id] += 1
+
+        scored = []
+        for id, count in shared.items():
+            name_size = len(self._grams[id])
+            dice = 2 * count / (len(query_grams) + name_size)
+            coverage = count / name_size
+            score = 0.6 * dice + 0.4 * coverage
+            if score >= min_score:
+                scored.append((id, round(score, 3)))
+
+        scored.sort(key=lambda pair: (-pair[1], pair[0]))
+        return scored[:limit]
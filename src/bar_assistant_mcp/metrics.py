@@ -0,0 +1,277 @@
+"""Prometheus metrics for tool calls and Bar Assistant API requests.
+
+Metrics are kept in memory with no extra dependencies and rendered in
+the Prometheus text exposition format, which Prometheus and OpenMetrics
+scrapers both accept.
+"""
+
+import asyncio
+import contextlib
+import os
+import re
+import tempfile
+import time
+
+import httpx
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from cache hits to slow paginated reads
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ID_RE = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_label(path):
+    """Collapse IDs in a request path so each endpoint is one time series."""
+    return _ID_RE.sub("/{id}", path)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount=1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, label_values)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> (bucket counts, sum, count)
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _labels(self.labels, label_values, [("le", _number(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Metrics:
+    """Every metric the server records, plus values read at scrape time."""
+
+    def __init__(self):
+        self.tool_duration = Histogram(
+            "bar_assistant_mcp_tool_duration_seconds",
+            "Time spent handling MCP tool calls and resource reads.",
+            ("tool", "outcome")
+        )
+        self.request_duration = Histogram(
+            "bar_assistant_mcp_http_request_duration_seconds",
+            "Time until API responses were fully read, including cache hits.",
+            ("method", "endpoint", "status")
+        )
+        self.upstream_requests = Counter(
+            "bar_assistant_mcp_http_upstream_requests_total",
+            "Requests actually sent to the Bar Assistant API, including retries.",
+            ("method", "endpoint", "status")
+        )
+        self.response_bytes = Counter(
+            "bar_assistant_mcp_http_response_bytes_total",
+            "Response body bytes read from the API or the cache.",
+            ("method", "endpoint")
+        )
+        self.retries = Counter(
+            "bar_assistant_mcp_http_retries_total",
+            "Requests retried after a failure.",
+            ("method", "endpoint")
+        )
+        self._collected = []
+
+    def collect(self, name, help, read, type="gauge"):
+        """Register a metric kept elsewhere, read as a ``{labels: value}`` dict on every scrape.
+
+        Labels are tuples of ``(name, value)`` pairs.
+        """
+        self._collected.append((name, help, type, read))
+
+    @contextlib.contextmanager
+    def time_tool(self, name):
+        """Time a tool call or resource read, labelled by whether it raised."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.tool_duration.observe(time.perf_counter() - started, name, outcome)
+
+    def retried(self, request):
+        self.retries.inc(request.method, endpoint_label(request.url.path))
+
+    def render(self):
+        lines = []
+        for metric in (self.tool_duration, self.request_duration, self.upstream_requests,
+                       self.response_bytes, self.retries):
+            lines += metric.render()
+        for name, help, type, read in self._collected:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {type}"]
+            for labels, value in sorted(read().items()):
+                lines.append(f"{name}{_labels([k for k, _ in labels], [v for _, v in labels])} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the current metrics to a file atomically, e.g. for a textfile collector."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.render())
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+
+class _MeasuredStream(httpx.AsyncByteStream):
+    """Response stream that reports its size and read time once closed."""
+
+    def __init__(self, stream, done):
+        self._stream = stream
+        self._done = done
+        self._size = 0
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._size += len(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            done, self._done = self._done, None
+            if done is not None:
+                done(self._size)
+
+
+class MetricsTransport(httpx.AsyncBaseTransport):
+    """Transport recording request metrics.
+
+    With ``upstream`` set it sits next to the network and counts the
+    requests that really reach the API; otherwise it wraps the whole
+    stack and times requests as the tools see them, cache hits included.
+    """
+
+    def __init__(self, transport, metrics, upstream=False):
+        self._transport = transport
+        self._metrics = metrics
+        self._upstream = upstream
+
+    async def handle_async_request(self, request):
+        method, endpoint = request.method, endpoint_label(request.url.path)
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as e:
+            status = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+            if self._upstream:
+                self._metrics.upstream_requests.inc(method, endpoint, status)
+            else:
+                self._metrics.request_duration.observe(time.perf_counter() - started, method, endpoint, status)
+            raise
+
+        status = str(response.status_code)
+        if self._upstream:
+            self._metrics.upstream_requests.inc(method, endpoint, status)
+            return response
+
+        def done(size):
+            self._metrics.request_duration.observe(time.perf_counter() - started, method, endpoint, status)
+            self._metrics.response_bytes.inc(method, endpoint, amount=size)
+
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_MeasuredStream(response.stream, done),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+async def serve_metrics(metrics, host="127.0.0.1", port=9464):
+    """Serve ``GET /metrics`` on a small local HTTP server until cancelled."""
+
+    async def handle(reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, content_type, body = "200 OK", CONTENT_TYPE, metrics.render().encode()
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b"Not Found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+async def dump_metrics(metrics, path, interval=15.0):
+    """Rewrite the metrics file every ``interval`` seconds until cancelled."""
+    try:
+        while True:
+            await asyncio.to_thread(metrics.write, path)
+            await asyncio.sleep(interval)
+    finally:
+        metrics.write(path)
@@ -0,0 +1,155 @@
+"""Client-side rate limiting and concurrency control per API host."""
+
+import asyncio
+import time
+
+import httpx
+
+
+class TokenBucket:
+    """Token bucket allowing ``rate`` requests per second with bursts of ``burst``.
+
+    Waiters reserve tokens in arrival order, so a burst of callers is
+    spread out evenly instead of racing for the next free token.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Take one token, waiting until it is available."""
+        if not self.rate or self.rate <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class LimiterStats:
+    """Queue-wait statistics used to size the rate limiter."""
+
+    def __init__(self):
+        self.requests = 0
+        self.delayed = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.queued = 0
+        self.in_flight = 0
+
+    def record_wait(self, seconds):
+        self.requests += 1
+        if seconds > 0.001:
+            self.delayed += 1
+        self.wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "delayed": self.delayed,
+            "wait_seconds_total": round(self.wait_seconds, 3),
+            "wait_seconds_avg": round(self.wait_seconds / self.requests, 4) if self.requests else 0.0,
+            "wait_seconds_max": round(self.max_wait_seconds, 3),
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+        }
+
+
+class RateLimiter:
+    """Request budget per API host: a token bucket plus an in-flight cap."""
+
+    def __init__(self, rate=10.0, burst=20, max_in_flight=8):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self._hosts: dict[str, tuple[TokenBucket, asyncio.Semaphore, LimiterStats]] = {}
+
+    def host(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = (
+                TokenBucket(self.rate, self.burst),
+                asyncio.Semaphore(max(1, self.max_in_flight)),
+                LimiterStats(),
+            )
+        return self._hosts[host]
+
+    def stats(self):
+        """Get the queue-wait statistics for every host seen so far."""
+        return {host: stats.as_dict() for host, (_, _, stats) in self._hosts.items()}
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that frees its in-flight slot once the body is closed."""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class RateLimitTransport(httpx.AsyncBaseTransport):
+    """Transport that waits for the host's request budget before sending.
+
+    An in-flight slot is held until the response body has been read, so
+    the concurrency cap covers the whole exchange.
+    """
+
+    def __init__(self, transport, limiter):
+        self._transport = transport
+        self._limiter = limiter
+
+    async def handle_async_request(self, request):
+        bucket, semaphore, stats = self._limiter.host(request.url.host)
+
+        started = time.monotonic()
+        stats.queued += 1
+        try:
+            await bucket.acquire()
+            await semaphore.acquire()
+        finally:
+            stats.queued -= 1
+        stats.record_wait(time.monotonic() - started)
+        stats.in_flight += 1
+
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                stats.in_flight -= 1
+                semaphore.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
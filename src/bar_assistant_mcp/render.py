@@ -0,0 +1,269 @@
+"""Rendering of tool and resource results as Markdown or compact JSON.
+
+Tools first build a plain result dict, which is returned as-is in JSON
+mode or passed to one of the Markdown renderers below. Renderers collect
+lines in a list and join them once, so large shelves render in linear
+time.
+"""
+
+import json
+
+
+OUTPUT_FORMATS = ("markdown", "json")
+
+
+def to_json(data):
+    """Serialize a result as compact JSON."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _text(lines):
+    return "\n".join(lines) + "\n"
+
+
+def _ref(record):
+    return f"{record.get('name')} (ID: {record.get('id')})"
+
+
+def _bold_ref(record):
+    return f"**{record.get('name')}** (ID: {record.get('id')})"
+
+
+def _listed_ref(record):
+    if "name" in record:
+        return _ref(record)
+    return f"ID: {record.get('id')}"
+
+
+def _field_lines(record, skip=("id", "name", "short_ingredients")):
+    return [
+        f"  {key}: {', '.join(map(str, value)) if isinstance(value, list) else value}"
+        for key, value in record.items()
+        if key not in skip and value is not None
+    ]
+
+
+_RECIPE_KEYS = ("ingredients", "instructions", "garnish", "glass", "method")
+
+
+def _recipe_lines(cocktail):
+    if "ingredients" not in cocktail:
+        return []
+    lines = []
+    for ing in cocktail["ingredients"]:
+        amount = ing.get("amount")
+        if isinstance(amount, float) and amount.is_integer():
+            amount = int(amount)
+        measure = " ".join(str(part) for part in (amount, ing.get("units")) if part is not None)
+        line = f"  - {measure} {_ref(ing)}" if measure else f"  - {_ref(ing)}"
+        if ing.get("optional"):
+            line += " (optional)"
+        if ing.get("note"):
+            line += f" - {ing['note']}"
+        lines.append(line)
+    lines += [f"  {key.capitalize()}: {cocktail[key]}" for key in ("garnish", "glass", "method") if cocktail.get(key)]
+    if cocktail.get("instructions"):
+        lines.append("  Instructions:")
+        lines += [f"    {line}" for line in cocktail["instructions"].splitlines() if line.strip()]
+    return lines
+
+
+def _more(data, count, tool=None):
+    if not data.get("next_cursor"):
+        return []
+    first = data["offset"] + 1
+    cursor = f"cursor \"{data['next_cursor']}\""
+    # Multi-bar results continue one bar at a time, with that bar's own tool
+    resume = f"Call {tool} with bar_id={data['id']} and {cursor}" if tool else f"Pass {cursor}"
+    return ["", f"Showing {first}-{first + count - 1} of {data['total']}. {resume} for more."]
+
+
+def bars(data):
+    lines = ["Available bars:", ""]
+    for bar in data["bars"]:
+        lines += [_bold_ref(bar), f"  Slug: {bar.get('slug')}", ""]
+    return _text(lines)
+
+
+def _shelf_ingredient_lines(data, tool=None):
+    lines = [f"Found {data['total']} ingredients on your bar shelf:", ""]
+    for ing in data["ingredients"]:
+        lines.append(f"- {_listed_ref(ing)}")
+        lines += _field_lines(ing)
+    lines += _more(data, len(data["ingredients"]), tool)
+    return lines
+
+
+def shelf_ingredients(data):
+    return _text(_shelf_ingredient_lines(data))
+
+
+def _cocktail_lines(data, heading, tool=None):
+    lines = [heading, ""]
+    for cocktail in data["cocktails"]:
+        lines.append(_bold_ref(cocktail) if "name" in cocktail else _listed_ref(cocktail))
+        if cocktail.get("short_ingredients"):
+            lines.append(f"  • {', '.join(cocktail['short_ingredients'])}")
+        lines += _field_lines(cocktail, skip=("id", "name", "short_ingredients", *_RECIPE_KEYS))
+        lines += _recipe_lines(cocktail)
+    lines += _more(data, len(data["cocktails"]), tool)
+    return lines
+
+
+def cocktail_list(data, heading):
+    return _text(_cocktail_lines(data, heading))
+
+
+def shelf_cocktails(data):
+    return cocktail_list(data, f"You can make {data['total']} cocktails:")
+
+
+def _per_bar(data, bar_lines):
+    lines = []
+    for bar in data["bars"]:
+        lines += [f"## {_ref(bar)}" if bar.get("name") else f"## Bar {bar['id']}", ""]
+        lines += [f"Error: {bar['error']}"] if "error" in bar else bar_lines(bar)
+        lines.append("")
+    return _text(lines[:-1])
+
+
+def bars_shelf_ingredients(data):
+    return _per_bar(data, lambda bar: _shelf_ingredient_lines(bar, "get_shelf_ingredients"))
+
+
+def bars_shelf_cocktails(data):
+    return _per_bar(
+        data, lambda bar: _cocktail_lines(bar, f"You can make {bar['total']} cocktails:", "get_shelf_cocktails")
+    )
+
+
+def makeable(data):
+    query = data["query"]
+    if query == "next_purchase":
+        if not data["ingredients"]:
+            return "No single ingredient would unlock a new cocktail."
+        lines = ["Best ingredients to buy next:", ""]
+        lines += [f"- {_bold_ref(ing)} - unlocks {ing['unlocks']} cocktails" for ing in data["ingredients"]]
+        return _text(lines)
+
+    if query == "missing_one":
+        lines = [f"{data['total']} cocktails are missing exactly one ingredient:", ""]
+        for cocktail in data["cocktails"]:
+            lines.append(f"{_bold_ref(cocktail)} - needs {_ref(cocktail['missing'])}")
+            lines += _recipe_lines(cocktail)
+    else:
+        added = " with those ingredients added" if data.get("if_added") else ""
+        lines = [f"You can make {data['total']} cocktails{added}:", ""]
+        for cocktail in data["cocktails"]:
+            lines.append(_bold_ref(cocktail))
+            lines += _recipe_lines(cocktail)
+    if data["total"] > len(data["cocktails"]):
+        lines += ["", f"...and {data['total'] - len(data['cocktails'])} more"]
+    return _text(lines)
+
+
+def ingredient_search(data):
+    if data["ingredients"]:
+        lines = ["Found ingredients:", ""]
+        for ing in data["ingredients"]:
+            lines.append(f"- {_bold_ref(ing)}")
+            if ing.get("description"):
+                lines.append(f"  {ing['description'][:100]}...")
+        return _text(lines)
+    if not data.get("closest"):
+        return "No ingredients found matching your search."
+    lines = ["No exact matches. Closest ingredients:", ""]
+    lines += [f"- **{ing['name']}** (ID: {ing['id']}, score: {ing['score']})" for ing in data["closest"]]
+    return _text(lines)
+
+
+def ingredient_matches(data):
+    if not data["matches"]:
+        return "No ingredients found matching your search."
+    lines = [f"Closest ingredients to \"{data['query']}\":", ""]
+    lines += [f"- **{ing['name']}** (ID: {ing['id']}, score: {ing['score']})" for ing in data["matches"]]
+    return _text(lines)
+
+
+def resolution(data):
+    lines = [f"Resolved {len(data['resolved'])} of {data['total']} ingredients:", ""]
+    for name, ing in data["resolved"].items():
+        created = " (created)" if ing.get("created") else ""
+        lines.append(f"- {name} → {_bold_ref(ing)}{created}")
+    if data["ambiguous"]:
+        lines += ["", "Ambiguous (pick one of the candidates):", ""]
+        lines += [
+            f"- {name}: {', '.join(_ref(ing) for ing in candidates)}"
+            for name, candidates in data["ambiguous"].items()
+        ]
+    if data["missing"]:
+        lines += ["", "Not found (use create_missing or create_ingredient):", ""]
+        errors = data.get("errors") or {}
+        lines += [
+            f"- {name} (creating it failed: {errors[name]})" if name in errors else f"- {name}"
+            for name in data["missing"]
+        ]
+    return _text(lines)
+
+
+def shelf_change(data):
+    if "added" in data:
+        return f"Successfully added {len(data['added'])} ingredients to your bar shelf!"
+    return f"Successfully removed {len(data['removed'])} ingredients from your bar shelf!"
+
+
+def created_ingredient(data):
+    ing = data["ingredient"]
+    lines = ["Successfully created ingredient!", "", _bold_ref(ing)]
+    if ing.get("strength"):
+        lines.append(f"  Strength: {ing['strength']}%")
+    if ing.get("description"):
+        lines.append(f"  Description: {ing['description']}")
+    if ing.get("origin"):
+        lines.append(f"  Origin: {ing['origin']}")
+    return _text(lines)
+
+
+def saved_cocktail(data):
+    cocktail = data["cocktail"]
+    lines = [f"Successfully {data['action']} cocktail!", "", _bold_ref(cocktail)]
+    if cocktail.get("description"):
+        lines.append(f"  Description: {cocktail['description']}")
+    if cocktail.get("garnish"):
+        lines.append(f"  Garnish: {cocktail['garnish']}")
+    if cocktail.get("instructions"):
+        lines += ["", "**Instructions:**", cocktail["instructions"]]
+    return _text(lines)
+
+
+def bulk_report(data):
+    lines = [f"Created {data['created']} of {len(data['results'])} cocktails:", ""]
+    for outcome in data["results"]:
+        if outcome["ok"]:
+            lines.append(f"- OK {_bold_ref(outcome)}")
+        else:
+            lines.append(f"- FAILED **{outcome['name']}**: {outcome['error']}")
+    if data.get("created_ingredients"):
+        lines += ["", f"Created {len(data['created_ingredients'])} new ingredients:", ""]
+        lines += [f"- {_ref(ing)}" for ing in data["created_ingredients"]]
+    return _text(lines)
+
+
+def shelf_ingredients_resource(data):
+    lines = [f"# Bar Shelf Ingredients ({data['total']} total)", ""]
+    for ing in data["ingredients"]:
+        lines.append(f"- {_bold_ref(ing)}" if "name" in ing else f"- {_listed_ref(ing)}")
+        lines += _field_lines(ing)
+    lines += _more(data, len(data["ingredients"]))
+    return _text(lines)
+
+
+def shelf_cocktails_resource(data):
+    lines = [f"# Cocktails You Can Make ({data['total']} total)", ""]
+    for cocktail in data["cocktails"]:
+        lines.append(f"- **{cocktail['name']}**" if "name" in cocktail else f"- {_listed_ref(cocktail)}")
+        if cocktail.get("short_ingredients"):
+            lines.append(f"  Ingredients: {', '.join(cocktail['short_ingredients'])}")
+        lines += _field_lines(cocktail)
+    lines += _more(data, len(data["cocktails"]))
+    return _text(lines)
@@ -0,0 +1,88 @@
+"""Automatic retries with exponential backoff for Bar Assistant API requests."""
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Responses that mean the request was not processed, so any method may retry
+SAFE_RETRY_STATUS_CODES = {429, 503}
+# Responses worth retrying for idempotent requests only
+RETRY_STATUS_CODES = SAFE_RETRY_STATUS_CODES | {502, 504}
+
+# Failures that happen before the request reaches the server
+SAFE_RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Failures that may happen after the server received the request
+RETRY_EXCEPTIONS = SAFE_RETRY_EXCEPTIONS + (httpx.ReadError, httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Transport that transparently retries failed requests.
+
+    GET requests are retried on throttling, gateway errors and dropped
+    connections. Other methods are only retried when the request cannot
+    have been processed: connection failures, 429 and 503. Delays grow
+    exponentially with full jitter, and a ``Retry-After`` header takes
+    precedence when present. ``on_retry`` is called with the request
+    before every retry.
+    """
+
+    def __init__(self, transport, retries=3, backoff=0.5, max_delay=30.0, on_retry=None):
+        self._transport = transport
+        self._on_retry = on_retry
+        self.retries = retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.retry_count = 0
+
+    def _delay(self, attempt, response=None):
+        retry_after = parse_retry_after(response.headers.get("retry-after")) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.backoff * 2 ** attempt))
+
+    async def handle_async_request(self, request):
+        idempotent = request.method in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUS_CODES if idempotent else SAFE_RETRY_STATUS_CODES
+        retry_exceptions = RETRY_EXCEPTIONS if idempotent else SAFE_RETRY_EXCEPTIONS
+
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = await self._transport.handle_async_request(request)
+            except retry_exceptions:
+                if last_attempt:
+                    raise
+                delay = self._delay(attempt)
+            else:
+                if response.status_code not in retry_statuses or last_attempt:
+                    return response
+                delay = self._delay(attempt, response)
+                await response.aclose()
+
+            self.retry_count += 1
+            if self._on_retry is not None:
+                self._on_retry(request)
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
@@ -1,19 +1,44 @@
 import asyncio
+import contextlib
+import functools
+import json
+import logging
 import os
 import sys
 from typing import Any
 from pathlib import Path
+from urllib.parse import parse_qsl
 
 from mcp.server import Server
-from mcp.types import Resource, Tool, TextContent
+from mcp.types import InitializedNotification, Resource, Tool, TextContent
 import mcp.server.stdio
 import httpx
 from dotenv import load_dotenv
 
+from . import listing, render
+from .cache import ResponseCache
+from .client import create_client, fetch_all_pages, fetch_window
+from .index import IngredientIndex
+from .makeable import MakeableEngine
+from .metrics import Metrics, dump_metrics, serve_metrics
+from .ratelimit import RateLimiter
+from .singleflight import SingleFlight
+from .sync import fetch_changed
+from .tenant import TenantRegistry, current, use_tenant
+from .tools import ToolRegistry
+from .tracing import EXPORTERS, setup_tracing, shutdown_tracing, span
+from .web import TRANSPORTS, create_app, serve
+
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Command-line subcommands; anything else is treated as positional config
+SUBCOMMANDS = ("import", "serve")
+
+
 # Configuration with command-line argument support
 def get_config():
     """Get configuration from environment or command-line args."""
@@ -21,15 +46,66 @@ def get_config():
         "api_url": os.getenv("BAR_ASSISTANT_API_URL", "http://localhost:8000/api"),
         "token": os.getenv("BAR_ASSISTANT_TOKEN"),
         "bar_id": os.getenv("BAR_ASSISTANT_BAR_ID"),
+        # Default result format: markdown for people, json for programs
+        "output_format": os.getenv("BAR_ASSISTANT_OUTPUT_FORMAT", "markdown").lower(),
+        # MCP transport: stdio for one client, http or sse to serve many
+        "transport": os.getenv("BAR_ASSISTANT_TRANSPORT", "stdio").lower(),
+        "host": os.getenv("BAR_ASSISTANT_HOST", "127.0.0.1"),
+        "port": int(os.getenv("BAR_ASSISTANT_PORT", "8765")),
+        # Reject network clients that don't send their own API token
+        "require_client_token": os.getenv("BAR_ASSISTANT_REQUIRE_CLIENT_TOKEN", "false").lower() in ("1", "true", "yes"),
+        # HTTP connection pool settings
+        "max_connections": int(os.getenv("BAR_ASSISTANT_MAX_CONNECTIONS", "20")),
+        "max_keepalive_connections": int(os.getenv("BAR_ASSISTANT_MAX_KEEPALIVE_CONNECTIONS", "10")),
+        "keepalive_expiry": float(os.getenv("BAR_ASSISTANT_KEEPALIVE_EXPIRY", "30")),
+        "http2": os.getenv("BAR_ASSISTANT_HTTP2", "false").lower() in ("1", "true", "yes"),
+        # Maximum number of pages fetched at once when reading all pages
+        "page_concurrency": int(os.getenv("BAR_ASSISTANT_PAGE_CONCURRENCY", "4")),
+        # Bars fetched at once by the multi-bar tools
+        "bar_concurrency": int(os.getenv("BAR_ASSISTANT_BAR_CONCURRENCY", "4")),
+        # Most records a listing returns at once; the rest is behind a cursor
+        "max_results": max(1, int(os.getenv("BAR_ASSISTANT_MAX_RESULTS", "500"))),
+        # Request budget per API host: requests per second, burst size, in flight
+        "rate_limit": float(os.getenv("BAR_ASSISTANT_RATE_LIMIT", "10")),
+        "rate_burst": int(os.getenv("BAR_ASSISTANT_RATE_BURST", "20")),
+        "max_in_flight": int(os.getenv("BAR_ASSISTANT_MAX_IN_FLIGHT", "8")),
+        # Retries for failed requests, with exponential backoff in seconds
+        "retries": int(os.getenv("BAR_ASSISTANT_RETRIES", "3")),
+        "retry_backoff": float(os.getenv("BAR_ASSISTANT_RETRY_BACKOFF", "0.5")),
+        "retry_max_delay": float(os.getenv("BAR_ASSISTANT_RETRY_MAX_DELAY", "30")),
+        # Response cache for read-only endpoints
+        "cache": os.getenv("BAR_ASSISTANT_CACHE", "true").lower() in ("1", "true", "yes"),
+        "cache_max_bytes": int(os.getenv("BAR_ASSISTANT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+        # Local ingredient index used by search_ingredients
+        "index": os.getenv("BAR_ASSISTANT_INDEX", "true").lower() in ("1", "true", "yes"),
+        "index_refresh": float(os.getenv("BAR_ASSISTANT_INDEX_REFRESH", "300")),
+        # Seconds between full reloads that pick up deleted records
+        "reconcile_interval": float(os.getenv("BAR_ASSISTANT_RECONCILE_INTERVAL", "3600")),
+        # On-disk catalog snapshot for warm starts (path to a SQLite file)
+        "snapshot": os.getenv("BAR_ASSISTANT_SNAPSHOT"),
+        # Prometheus metrics: collected in memory, exposed on a port or in a file
+        "metrics": os.getenv("BAR_ASSISTANT_METRICS", "true").lower() in ("1", "true", "yes"),
+        "metrics_port": int(os.getenv("BAR_ASSISTANT_METRICS_PORT", "0")),
+        "metrics_file": os.getenv("BAR_ASSISTANT_METRICS_FILE"),
+        "metrics_interval": float(os.getenv("BAR_ASSISTANT_METRICS_INTERVAL", "15")),
+        # OpenTelemetry tracing: off, otlp, console (stderr) or file
+        "tracing": os.getenv("BAR_ASSISTANT_TRACING", "off").lower(),
+        "trace_file": os.getenv("BAR_ASSISTANT_TRACE_FILE"),
+        # Bulk cocktail import: parallel submissions and starts per second
+        "bulk_concurrency": int(os.getenv("BAR_ASSISTANT_BULK_CONCURRENCY", "4")),
+        "bulk_rate": float(os.getenv("BAR_ASSISTANT_BULK_RATE", "5")),
     }
     
     # Override with command-line arguments if provided
-    if len(sys.argv) > 1:
-        config["api_url"] = sys.argv[1]
-    if len(sys.argv) > 2:
-        config["token"] = sys.argv[2]
-    if len(sys.argv) > 3:
-        config["bar_id"] = sys.argv[3]
+    args = sys.argv[1:]
+    if args and args[0] in SUBCOMMANDS:
+        args = []
+    if len(args) > 0:
+        config["api_url"] = args[0]
+    if len(args) > 1:
+        config["token"] = args[1]
+    if len(args) > 2:
+        config["bar_id"] = args[2]
     
     return config
 
@@ -37,6 +113,878 @@ def get_config():
 CONFIG = get_config()
 app = Server("bar-assistant-mcp")
 
+# Response cache, request budget and in-flight request table shared by
+# every client the server creates
+CACHE = ResponseCache(max_bytes=CONFIG["cache_max_bytes"]) if CONFIG["cache"] else None
+LIMITER = RateLimiter(
+    rate=CONFIG["rate_limit"],
+    burst=CONFIG["rate_burst"],
+    max_in_flight=CONFIG["max_in_flight"]
+)
+REQUESTS = SingleFlight()
+# Coalesces concurrent loads of the same local catalog
+LOADS = SingleFlight()
+SNAPSHOT = None
+if CONFIG["snapshot"]:
+    from .snapshot import Snapshot
+    SNAPSHOT = Snapshot(CONFIG["snapshot"])
+# Tool and API request metrics, with gauges read from the shared objects
+METRICS = Metrics() if CONFIG["metrics"] else None
+if METRICS is not None:
+    METRICS.collect(
+        "bar_assistant_mcp_cache_lookups_total",
+        "Response cache lookups by result.",
+        lambda: {} if CACHE is None else {
+            (("result", "hit"),): CACHE.hits,
+            (("result", "miss"),): CACHE.misses,
+            (("result", "revalidated"),): CACHE.revalidations
+        },
+        type="counter"
+    )
+    METRICS.collect(
+        "bar_assistant_mcp_cache_bytes",
+        "Memory used by cached responses.",
+        lambda: {} if CACHE is None else {(): CACHE.size}
+    )
+    METRICS.collect(
+        "bar_assistant_mcp_coalesced_requests_total",
+        "Requests answered by sharing an identical in-flight request.",
+        lambda: {(): REQUESTS.shared},
+        type="counter"
+    )
+    METRICS.collect(
+        "bar_assistant_mcp_rate_limit_wait_seconds_total",
+        "Time requests waited for the rate limiter, per API host.",
+        lambda: {(("host", host),): stats["wait_seconds_total"] for host, stats in LIMITER.stats().items()},
+        type="counter"
+    )
+    METRICS.collect(
+        "bar_assistant_mcp_requests_in_flight",
+        "Requests currently sent to each API host.",
+        lambda: {(("host", host),): stats["in_flight"] for host, stats in LIMITER.stats().items()}
+    )
+
+# Local catalogs and sync marks of every API token the server has seen
+TENANTS = TenantRegistry(CONFIG["api_url"], CONFIG["token"], reconcile_interval=CONFIG["reconcile_interval"])
+
+# Shared HTTP client, created on first use and closed when the server stops
+_client: httpx.AsyncClient | None = None
+
+
+def new_client() -> httpx.AsyncClient:
+    """Create an HTTP client sharing the server's cache, limiter and metrics."""
+    return create_client(
+        CONFIG, cache=CACHE, limiter=LIMITER, flight=REQUESTS, metrics=METRICS,
+        tracing=CONFIG["tracing"] in EXPORTERS
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared, pooled HTTP client."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = new_client()
+    return _client
+
+
+async def close_client():
+    """Close the shared HTTP client and release its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# Background tasks cancelled when the server stops
+_background_tasks: set[asyncio.Task] = set()
+# Started once the first client has initialized its session
+_warm_up_task: asyncio.Task | None = None
+
+
+def traced(name):
+    """Run every call of an async function in its own span, tagged with the bar ID."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(bar_id, *args, **kwargs):
+            with span(name, **{"bar_assistant.bar_id": str(bar_id)}):
+                return await fn(bar_id, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def spawn(coro):
+    """Run a coroutine in the background for the lifetime of the server."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def timed(name):
+    """Record how long a tool call or resource read takes, if metrics are on."""
+    return METRICS.time_tool(name) if METRICS is not None else contextlib.nullcontext()
+
+
+def current_tenant():
+    """Get the tenant of the request being handled, or the server's own."""
+    context = current()
+    return context[0] if context is not None else TENANTS.get(CONFIG["token"])
+
+
+def default_bar_id():
+    """Get the bar ID used when a request doesn't name one."""
+    context = current()
+    return context[1] if context is not None else CONFIG["bar_id"]
+
+
+def session_context():
+    """Get the tenant and default bar ID of the client making the request.
+
+    Network clients may send their own token as ``Authorization: Bearer``
+    and a default bar as ``X-Bar-Assistant-Bar-Id``; stdio clients and
+    network clients without a token use the server's configuration.
+    """
+    try:
+        headers = getattr(app.request_context.request, "headers", None)
+    except LookupError:
+        headers = None
+    if headers is None:
+        return TENANTS.get(CONFIG["token"]), CONFIG["bar_id"]
+    
+    authorization = headers.get("authorization", "")
+    bar_id = headers.get("x-bar-assistant-bar-id")
+    if authorization.lower().startswith("bearer ") and authorization[7:].strip():
+        return TENANTS.get(authorization[7:].strip()), bar_id
+    if CONFIG["require_client_token"]:
+        raise PermissionError("This server requires an API token: send it as 'Authorization: Bearer <token>'")
+    return TENANTS.get(CONFIG["token"]), bar_id or CONFIG["bar_id"]
+
+
+async def save_snapshot(bar_id, kind, records, full=True):
+    """Persist catalog records to the on-disk snapshot, if enabled.
+
+    A full save replaces every record of the kind; otherwise only the
+    given records are written.
+    """
+    if SNAPSHOT is None:
+        return
+    save = SNAPSHOT.save if full else SNAPSHOT.upsert
+    try:
+        await asyncio.to_thread(save, current_tenant().scope, int(bar_id), kind, records)
+    except SNAPSHOT.Error as e:
+        logger.warning("Failed to save %s snapshot for bar %s: %s", kind, bar_id, e)
+
+
+def restore_snapshot(bar_id):
+    """Load a bar's ingredient index and makeable engine from the snapshot.
+
+    Returns True if anything was restored.
+    """
+    bar_id = int(bar_id)
+    tenant = current_tenant()
+    try:
+        ingredients = SNAPSHOT.load(tenant.scope, bar_id, "ingredients")
+        cocktails = SNAPSHOT.load(tenant.scope, bar_id, "cocktails")
+        shelf = SNAPSHOT.load(tenant.scope, bar_id, "shelf")
+    except SNAPSHOT.Error as e:
+        logger.warning("Failed to read snapshot for bar %s: %s", bar_id, e)
+        return False
+    
+    if ingredients is not None:
+        index = IngredientIndex()
+        index.load(ingredients)
+        tenant.indexes[bar_id] = index
+        tenant.sync.mark_full(
+            bar_id, "ingredients", ingredients,
+            reconciled_at=SNAPSHOT.synced_at(tenant.scope, bar_id, "ingredients")
+        )
+    if cocktails is not None and shelf is not None:
+        engine = MakeableEngine()
+        engine.load(cocktails, [ing["id"] for ing in shelf])
+        tenant.engines[bar_id] = engine
+        tenant.sync.mark_full(
+            bar_id, "cocktails", cocktails,
+            reconciled_at=SNAPSHOT.synced_at(tenant.scope, bar_id, "cocktails")
+        )
+    return ingredients is not None or cocktails is not None
+
+
+def warm_up():
+    """Start getting the server ready for its first tool call, once.
+
+    Creating the HTTP client (which loads TLS certificates), restoring the
+    snapshot and prefetching the default bar's ingredients all happen in
+    the background after a client has initialized its session, so none of
+    it delays the ``initialize`` response.
+    """
+    global _warm_up_task
+    if _warm_up_task is None:
+        with use_tenant(TENANTS.get(CONFIG["token"]), CONFIG["bar_id"]):
+            _warm_up_task = spawn(_warm_up())
+
+
+async def _warm_up():
+    global _client
+    if _client is None:
+        client = await asyncio.to_thread(new_client)
+        if _client is None:
+            _client = client
+        else:
+            await client.aclose()
+    bar_id = CONFIG["bar_id"]
+    if SNAPSHOT is not None:
+        tenant = current_tenant()
+        try:
+            tenant.snapshot_bars = await asyncio.to_thread(SNAPSHOT.load, tenant.scope, 0, "bars")
+        except SNAPSHOT.Error as e:
+            logger.warning("Failed to read bars snapshot: %s", e)
+        if bar_id and await asyncio.to_thread(restore_snapshot, bar_id):
+            spawn(sync_bar(bar_id))
+    if CONFIG["index"] and bar_id:
+        get_index(bar_id)
+
+
+async def on_initialized(notification):
+    warm_up()
+
+
+app.notification_handlers[InitializedNotification] = on_initialized
+
+
+async def sync_ingredients(bar_id):
+    """Apply ingredients changed since the last sync to a bar's index."""
+    tenant = current_tenant()
+    if tenant.sync.needs_full(bar_id, "ingredients"):
+        await load_index(bar_id)
+        return
+    changed = await fetch_changed(
+        get_client(),
+        f"{CONFIG['api_url']}/ingredients",
+        tenant.sync.since(bar_id, "ingredients"),
+        headers=get_headers(bar_id)
+    )
+    if changed is None:
+        await load_index(bar_id)
+        return
+    tenant.sync.advance(bar_id, "ingredients", changed)
+    if changed:
+        tenant.indexes[bar_id].upsert(changed)
+        await save_snapshot(bar_id, "ingredients", changed, full=False)
+
+
+async def sync_cocktails(bar_id):
+    """Apply cocktails changed since the last sync, and the current shelf."""
+    tenant = current_tenant()
+    if tenant.sync.needs_full(bar_id, "cocktails"):
+        await load_engine(bar_id)
+        return
+    client = get_client()
+    changed, shelf = await asyncio.gather(
+        fetch_changed(
+            client,
+            f"{CONFIG['api_url']}/cocktails",
+            tenant.sync.since(bar_id, "cocktails"),
+            headers=get_headers(bar_id),
+            params={"include": "ingredients.ingredient"}
+        ),
+        fetch_all_pages(
+            client,
+            f"{CONFIG['api_url']}/ingredients",
+            headers=get_headers(bar_id),
+            params={"filter[bar_shelf]": "true"},
+            concurrency=CONFIG["page_concurrency"]
+        )
+    )
+    if changed is None:
+        await load_engine(bar_id)
+        return
+    engine = tenant.engines[bar_id]
+    for cocktail in changed:
+        engine.set_cocktail(cocktail)
+    engine.set_shelf(ing["id"] for ing in shelf)
+    tenant.sync.advance(bar_id, "cocktails", changed)
+    await save_snapshot(bar_id, "cocktails", changed, full=False)
+    await save_snapshot(bar_id, "shelf", [{"id": ing["id"]} for ing in shelf])
+
+
+@traced("sync_bar")
+async def sync_bar(bar_id):
+    """Bring a bar's local catalogs up to date, fetching only what changed.
+
+    Catalogs are fully reloaded instead when they were never loaded, when
+    the reconciliation interval has passed, or when the API can't provide
+    a reliable delta.
+    """
+    bar_id = int(bar_id)
+    tenant = current_tenant()
+    syncs = []
+    if bar_id in tenant.indexes:
+        syncs.append(sync_ingredients(bar_id))
+    if bar_id in tenant.engines:
+        syncs.append(sync_cocktails(bar_id))
+    for outcome in await asyncio.gather(*syncs, return_exceptions=True):
+        if isinstance(outcome, Exception):
+            logger.warning("Failed to sync catalog for bar %s: %s", bar_id, outcome)
+
+
+async def fetch_bars():
+    """Fetch the bars the token has access to."""
+    response = await get_client().get(
+        f"{CONFIG['api_url']}/bars",
+        headers=get_headers()
+    )
+    response.raise_for_status()
+    bars = response.json().get("data", [])
+    await save_snapshot(0, "bars", bars)
+    return bars
+
+
+async def get_bars():
+    """Get the list of bars, answering the first call from the snapshot."""
+    tenant = current_tenant()
+    if tenant.snapshot_bars is not None:
+        bars, tenant.snapshot_bars = tenant.snapshot_bars, None
+        spawn(fetch_bars())
+        return bars
+    return await fetch_bars()
+
+
+@traced("load_index")
+async def load_index(bar_id):
+    """Download a bar's full ingredient catalog into its local index."""
+    bar_id = int(bar_id)
+    ingredients = await fetch_all_pages(
+        get_client(),
+        f"{CONFIG['api_url']}/ingredients",
+        headers=get_headers(bar_id),
+        concurrency=CONFIG["page_concurrency"]
+    )
+    tenant = current_tenant()
+    index = tenant.indexes.get(bar_id) or IngredientIndex()
+    index.load(ingredients)
+    tenant.indexes[bar_id] = index
+    tenant.sync.mark_full(bar_id, "ingredients", ingredients)
+    await save_snapshot(bar_id, "ingredients", ingredients)
+    return index
+
+
+def get_index(bar_id):
+    """Get a bar's ingredient index, or None while it is still cold.
+
+    A cold index starts loading in the background so later lookups can be
+    answered locally.
+    """
+    if not CONFIG["index"] or not bar_id:
+        return None
+    bar_id = int(bar_id)
+    tenant = current_tenant()
+    index = tenant.indexes.get(bar_id)
+    if index is not None and index.ready:
+        return index
+    if bar_id not in tenant.index_loads:
+        task = asyncio.create_task(load_index(bar_id))
+        tenant.index_loads[bar_id] = task
+        task.add_done_callback(lambda t: _index_load_done(tenant, bar_id, t))
+    return None
+
+
+async def ensure_index(bar_id):
+    """Get a bar's ingredient index, waiting for it to load if it is cold.
+
+    Tools that need the whole catalog use the index even when it is
+    disabled. It is then loaded on first use and kept, and since no
+    background sync runs, it is synced before use once it is older than
+    ``index_refresh``.
+    """
+    index = get_index(bar_id)
+    if index is not None:
+        return index
+    bar_id = int(bar_id)
+    tenant = current_tenant()
+    task = tenant.index_loads.get(bar_id)
+    if task is not None:
+        return await task
+    index = tenant.indexes.get(bar_id)
+    if index is None or not index.ready:
+        return await LOADS.do(("index", tenant.key, bar_id), lambda: load_index(bar_id))
+    if tenant.sync.age(bar_id, "ingredients") > CONFIG["index_refresh"]:
+        try:
+            await LOADS.do(("index_sync", tenant.key, bar_id), lambda: sync_ingredients(bar_id))
+        except Exception as e:
+            logger.warning("Failed to sync ingredient index for bar %s: %s", bar_id, e)
+    return tenant.indexes[bar_id]
+
+
+def _index_load_done(tenant, bar_id, task):
+    tenant.index_loads.pop(bar_id, None)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Failed to load ingredient index for bar %s: %s", bar_id, task.exception())
+
+
+@traced("load_engine")
+async def load_engine(bar_id):
+    """Download a bar's cocktails and shelf into its makeable engine."""
+    bar_id = int(bar_id)
+    client = get_client()
+    cocktails, shelf = await asyncio.gather(
+        fetch_all_pages(
+            client,
+            f"{CONFIG['api_url']}/cocktails",
+            headers=get_headers(bar_id),
+            params={"include": "ingredients.ingredient"},
+            concurrency=CONFIG["page_concurrency"]
+        ),
+        fetch_all_pages(
+            client,
+            f"{CONFIG['api_url']}/ingredients",
+            headers=get_headers(bar_id),
+            params={"filter[bar_shelf]": "true"},
+            concurrency=CONFIG["page_concurrency"]
+        )
+    )
+    tenant = current_tenant()
+    engine = tenant.engines.get(bar_id) or MakeableEngine()
+    engine.load(cocktails, [ing["id"] for ing in shelf])
+    tenant.engines[bar_id] = engine
+    tenant.sync.mark_full(bar_id, "cocktails", cocktails)
+    await save_snapshot(bar_id, "cocktails", cocktails)
+    await save_snapshot(bar_id, "shelf", [{"id": ing["id"]} for ing in shelf])
+    return engine
+
+
+async def ensure_engine(bar_id):
+    """Get a bar's makeable engine, loading it on first use.
+
+    With the index disabled no background sync runs, so an engine older
+    than ``index_refresh`` is synced before use.
+    """
+    bar_id = int(bar_id)
+    tenant = current_tenant()
+    engine = tenant.engines.get(bar_id)
+    if engine is None:
+        return await LOADS.do(("engine", tenant.key, bar_id), lambda: load_engine(bar_id))
+    if not CONFIG["index"] and tenant.sync.age(bar_id, "cocktails") > CONFIG["index_refresh"]:
+        try:
+            await LOADS.do(("engine_sync", tenant.key, bar_id), lambda: sync_cocktails(bar_id))
+        except Exception as e:
+            logger.warning("Failed to sync cocktails for bar %s: %s", bar_id, e)
+    return tenant.engines[bar_id]
+
+
+async def sync_local_data():
+    """Periodically sync every ingredient index and makeable engine."""
+    while True:
+        await asyncio.sleep(CONFIG["index_refresh"])
+        for tenant in TENANTS:
+            with use_tenant(tenant):
+                for bar_id in sorted(set(tenant.indexes) | set(tenant.engines)):
+                    await sync_bar(bar_id)
+
+
+async def post_ingredient(bar_id, payload):
+    """Create an ingredient, keeping the cache and local index up to date."""
+    response = await get_client().post(
+        f"{CONFIG['api_url']}/ingredients",
+        headers=get_headers(bar_id),
+        json=payload
+    )
+    response.raise_for_status()
+    invalidate_cache(bar_id, r"/ingredients")
+    
+    ingredient = response.json().get("data", {})
+    index = current_tenant().indexes.get(int(bar_id)) if bar_id else None
+    if index is not None and ingredient.get("id") is not None:
+        index.add(ingredient)
+    return ingredient
+
+
+@traced("resolve_ingredient_names")
+async def resolve_ingredient_names(bar_id, names, create_missing=False):
+    """Resolve many ingredient names to IDs in one pass over the local index.
+
+    Returns a dict with ``resolved`` (name -> ingredient), ``ambiguous``
+    (name -> candidate ingredients) and ``missing`` (names) entries. With
+    ``create_missing``, missing ingredients are created concurrently and
+    reported as resolved and ``created``. A name whose creation failed
+    stays missing, with the reason in ``errors`` (name -> message).
+    """
+    index = await ensure_index(bar_id)
+    resolved, ambiguous, missing = {}, {}, []
+    for name in dict.fromkeys(names):
+        status, candidates = index.resolve(name)
+        if status == "resolved":
+            resolved[name] = candidates[0]
+        elif status == "ambiguous":
+            ambiguous[name] = candidates
+        else:
+            missing.append(name)
+    
+    created, errors = [], {}
+    if create_missing and missing:
+        outcomes = await asyncio.gather(
+            *(post_ingredient(bar_id, {"name": name}) for name in missing), return_exceptions=True
+        )
+        names, missing = missing, []
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("Failed to create ingredient %r: %s", name, outcome)
+                if isinstance(outcome, httpx.HTTPStatusError):
+                    errors[name] = f"HTTP {outcome.response.status_code}: {outcome.response.text[:200]}"
+                else:
+                    errors[name] = f"{type(outcome).__name__}: {outcome}"
+                missing.append(name)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                resolved[name] = outcome
+                created.append(name)
+    
+    return {"resolved": resolved, "ambiguous": ambiguous, "missing": missing, "created": created, "errors": errors}
+
+
+async def post_cocktail(bar_id, payload):
+    """Create a cocktail and drop the cached listings it makes stale."""
+    response = await get_client().post(
+        f"{CONFIG['api_url']}/cocktails",
+        headers=get_headers(bar_id),
+        json=payload
+    )
+    response.raise_for_status()
+    invalidate_cache(bar_id, r"/cocktails", r"/bars/\d+/cocktails")
+    
+    cocktail = response.json().get("data", {})
+    engine = current_tenant().engines.get(int(bar_id)) if bar_id else None
+    if engine is not None and cocktail.get("id") is not None:
+        engine.set_cocktail({**payload, "id": cocktail["id"]})
+    return cocktail
+
+
+@traced("bulk_create_cocktails")
+async def bulk_create_cocktails(bar_id, recipes, create_missing=False):
+    """Create many cocktails, resolving all their ingredient names in one pass.
+
+    Recipes take the same fields as create_cocktail, except that each
+    ingredient may give a ``name`` instead of an ``ingredient_id``. Returns
+    ``(report, created)``: ``(recipe_name, ok, cocktail_or_error)`` for
+    every recipe, in order, and the ingredients created along the way. A
+    missing ingredient that couldn't be created only fails the recipes
+    that use it.
+    """
+    from .bulk import ingredient_names, submit_all
+
+    names = ingredient_names(recipes)
+    resolution = {"resolved": {}, "ambiguous": {}, "created": [], "errors": {}}
+    if names:
+        resolution = await resolve_ingredient_names(bar_id, names, create_missing=create_missing)
+    ids = {name: ing["id"] for name, ing in resolution["resolved"].items()}
+    
+    async def submit(recipe):
+        ingredients = []
+        for ing in recipe.get("ingredients", []):
+            if ing.get("ingredient_id") is None:
+                ing_name = ing.get("name")
+                if ing_name in resolution["ambiguous"]:
+                    options = ", ".join(c["name"] for c in resolution["ambiguous"][ing_name])
+                    raise ValueError(f"ambiguous ingredient '{ing_name}' (could be: {options})")
+                if ing_name in resolution["errors"]:
+                    raise ValueError(f"could not create ingredient '{ing_name}': {resolution['errors'][ing_name]}")
+                if ing_name not in ids:
+                    raise ValueError(f"unknown ingredient '{ing_name}'")
+                ing = {**ing, "ingredient_id": ids[ing_name]}
+            ingredients.append(ing)
+        payload = build_cocktail_payload({**recipe, "ingredients": ingredients})
+        return await post_cocktail(bar_id, payload)
+    
+    outcomes = await submit_all(
+        recipes,
+        submit,
+        concurrency=CONFIG["bulk_concurrency"],
+        rate=CONFIG["bulk_rate"]
+    )
+    report = [
+        (recipe.get("name", f"#{position}"), ok, outcome)
+        for position, (recipe, (ok, outcome)) in enumerate(zip(recipes, outcomes), 1)
+    ]
+    return report, [resolution["resolved"][name] for name in resolution["created"]]
+
+
+def bulk_report_data(report, created=()):
+    """Turn a bulk import report and the ingredients it created into a plain result dict."""
+    results = [
+        {"name": outcome.get("name", cocktail_name), "ok": True, "id": outcome.get("id")} if ok
+        else {"name": cocktail_name, "ok": False, "error": str(outcome)}
+        for cocktail_name, ok, outcome in report
+    ]
+    data = {"created": sum(1 for _, ok, _ in report if ok), "results": results}
+    if created:
+        data["created_ingredients"] = [ingredient_summary(ing) for ing in created]
+    return data
+
+
+def format_bulk_report(report, created=()):
+    """Render a bulk import report as text."""
+    return render.bulk_report(bulk_report_data(report, created))
+
+
+def output_format(arguments=None):
+    """Get the result format requested by a tool call or resource URI."""
+    return (arguments or {}).get("format") or CONFIG["output_format"]
+
+
+def reply(arguments, data, renderer):
+    """Return a tool result as compact JSON or as Markdown from ``renderer``."""
+    if output_format(arguments) == "json":
+        return [TextContent(type="text", text=render.to_json(data))]
+    return [TextContent(type="text", text=renderer(data))]
+
+
+async def fetch_listing(url, bar_id, params, options):
+    """Fetch the part of a listing selected by listing options.
+
+    Without window options (limit, offset, cursor or sort) only the
+    requested API page is fetched, unless ``all_pages`` is set. Otherwise
+    sorting and paging are pushed to the API, falling back to sorting and
+    slicing every record locally if the API ignores them. Returns
+    ``(records, total, offset, limit, sort)``.
+    """
+    client = get_client()
+    headers = get_headers(bar_id)
+    if not options.get("all_pages") and not listing.is_windowed(options):
+        if options.get("page"):
+            params = {**params, "page": options["page"]}
+        response = await client.get(url, headers=headers, params=params)
+        response.raise_for_status()
+        data = response.json()
+        records = data.get("data", [])
+        meta = data.get("meta") or {}
+        per_page = int(meta.get("per_page") or len(records) or 1)
+        offset = (int(meta.get("current_page") or 1) - 1) * per_page
+        return records, int(meta.get("total") or offset + len(records)), offset, per_page, None
+    
+    offset, limit, sort = listing.window(options, CONFIG["max_results"])
+    if sort:
+        params = {**params, "sort": sort}
+    records, total = await fetch_window(
+        client, url, offset, limit, headers=headers, params=params, concurrency=CONFIG["page_concurrency"]
+    )
+    if records is None or (sort and not listing.is_sorted(records, sort)):
+        records = await fetch_all_pages(
+            client, url, headers=headers, params=params, concurrency=CONFIG["page_concurrency"]
+        )
+        if sort:
+            records = listing.sort_records(records, sort)
+        total = len(records)
+        records = records[offset:offset + limit]
+    return records, total, offset, limit, sort
+
+
+def listing_result(kind, fetched, fields):
+    """Build the result dict of a listing from what fetch_listing returned."""
+    records, total, offset, limit, sort = fetched
+    data = {"total": total, "offset": offset, kind: [listing.project(record, fields) for record in records]}
+    cursor = listing.next_cursor(offset, limit, len(records), total, sort)
+    if cursor:
+        data["next_cursor"] = cursor
+    return data
+
+
+async def select_bars(bar_ids):
+    """Get the bars named by a ``bar_ids`` argument, or every bar for "all"."""
+    if bar_ids == "all":
+        return [{"id": int(bar["id"]), "name": bar.get("name")} for bar in await get_bars()]
+    return [{"id": int(bar_id)} for bar_id in dict.fromkeys(bar_ids)]
+
+
+async def bars_listing(arguments, kind, listing_url, params, default_fields, hydrate=None):
+    """Fetch the same listing of several bars at once, with results per bar.
+
+    ``listing_url(bar_id)`` gives a bar's listing URL. Bars are fetched
+    concurrently, at most ``bar_concurrency`` at a time, over the shared
+    client. When given, ``hydrate(bar_id, records)`` completes each bar's
+    records. A bar that fails is reported with its error instead of
+    failing the whole call.
+    """
+    bars = await select_bars(arguments.get("bar_ids") or "all")
+    options = {key: arguments[key] for key in ("limit", "sort") if arguments.get(key)}
+    options["all_pages"] = True
+    fields = listing.parse_fields(arguments.get("fields")) or default_fields
+    semaphore = asyncio.Semaphore(max(1, CONFIG["bar_concurrency"]))
+
+    async def fetch(bar):
+        async with semaphore:
+            fetched = await fetch_listing(listing_url(bar["id"]), bar["id"], params, options)
+            result = listing_result(kind, fetched, fields)
+            if hydrate is not None:
+                result[kind] = await hydrate(bar["id"], result[kind])
+        return {**bar, **result}
+
+    results = []
+    for bar, outcome in zip(bars, await asyncio.gather(*(fetch(bar) for bar in bars), return_exceptions=True)):
+        if isinstance(outcome, Exception):
+            logger.warning("Failed to fetch %s of bar %s: %s", kind, bar["id"], outcome)
+            outcome = {**bar, "error": str(outcome).split("\n")[0] or type(outcome).__name__}
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        results.append(outcome)
+    return {"bars": results}
+
+
+# Cocktails hydrated per batched listing request
+HYDRATE_BATCH_SIZE = 100
+
+
+def cocktail_recipe(cocktail):
+    """Get the recipe of a full cocktail record: ingredients with amounts, instructions and so on."""
+    recipe = {key: cocktail[key] for key in ("instructions", "garnish") if cocktail.get(key)}
+    for key in ("glass", "method"):
+        value = cocktail.get(key)
+        if isinstance(value, dict):
+            value = value.get("name")
+        if value:
+            recipe[key] = value
+    ingredients = []
+    for ing in sorted(cocktail.get("ingredients") or [], key=lambda ing: ing.get("sort") or 0):
+        ingredient = ing.get("ingredient") or {}
+        entry = {
+            "id": ingredient.get("id", ing.get("ingredient_id")),
+            "name": ingredient.get("name", ing.get("name")),
+            "amount": ing.get("amount"),
+            "units": ing.get("units"),
+        }
+        if ing.get("optional"):
+            entry["optional"] = True
+        if ing.get("note"):
+            entry["note"] = ing["note"]
+        ingredients.append(entry)
+    recipe["ingredients"] = ingredients
+    return recipe
+
+
+@traced("hydrate_cocktails")
+async def hydrate_cocktails(bar_id, cocktails):
+    """Add the full recipe to each of a listing's cocktails.
+
+    Recipes still in the response cache are used as they are. The rest
+    are fetched from the cocktails listing in batches of
+    ``HYDRATE_BATCH_SIZE``, filtered by ID and with their ingredients
+    included, at most ``page_concurrency`` batches at a time. Cocktails a
+    batch doesn't return, e.g. because the API ignored the filter, are
+    fetched one by one. Every recipe is cached as the response of its
+    ``/cocktails/{id}`` endpoint, so later listings don't fetch it again.
+    """
+    client = get_client()
+    headers = get_headers(bar_id)
+    requests = {
+        cocktail_id: client.build_request("GET", f"{CONFIG['api_url']}/cocktails/{cocktail_id}", headers=headers)
+        for cocktail_id in dict.fromkeys(int(c["id"]) for c in cocktails if c.get("id") is not None)
+    }
+    recipes = {}
+    if CACHE is not None:
+        for cocktail_id, request in requests.items():
+            content = CACHE.lookup(request)
+            if content is not None:
+                recipes[cocktail_id] = json.loads(content).get("data") or {}
+    missing = [cocktail_id for cocktail_id in requests if cocktail_id not in recipes]
+    generation = CACHE.generation if CACHE is not None else None
+    semaphore = asyncio.Semaphore(max(1, CONFIG["page_concurrency"]))
+
+    async def fetch_batch(batch):
+        async with semaphore:
+            response = await client.get(
+                f"{CONFIG['api_url']}/cocktails",
+                headers=headers,
+                params={
+                    "filter[id]": ",".join(map(str, batch)),
+                    "include": "ingredients.ingredient",
+                    "per_page": len(batch),
+                }
+            )
+        response.raise_for_status()
+        for cocktail in response.json().get("data", []):
+            cocktail_id = int(cocktail.get("id") or 0)
+            if cocktail_id in batch and "ingredients" in cocktail:
+                recipes[cocktail_id] = cocktail
+                if CACHE is not None:
+                    CACHE.store(requests[cocktail_id], json.dumps({"data": cocktail}).encode(), generation)
+
+    async def fetch_one(cocktail_id):
+        async with semaphore:
+            response = await client.send(requests[cocktail_id])
+        response.raise_for_status()
+        recipes[cocktail_id] = response.json().get("data") or {}
+
+    batches = [missing[i:i + HYDRATE_BATCH_SIZE] for i in range(0, len(missing), HYDRATE_BATCH_SIZE)]
+    await asyncio.gather(*(fetch_batch(batch) for batch in batches))
+    await asyncio.gather(*(fetch_one(cocktail_id) for cocktail_id in missing if cocktail_id not in recipes))
+
+    return [
+        {**cocktail, **cocktail_recipe(recipes[int(cocktail["id"])])} if cocktail.get("id") is not None else cocktail
+        for cocktail in cocktails
+    ]
+
+
+def ingredient_summary(ingredient):
+    return {"id": ingredient.get("id"), "name": ingredient.get("name")}
+
+
+def cocktail_details(cocktail):
+    return {
+        key: cocktail[key]
+        for key in ("id", "name", "description", "garnish", "instructions", "source")
+        if cocktail.get(key) is not None
+    }
+
+
+def invalidate_cache(bar_id, *patterns):
+    """Drop cached responses for endpoints made stale by a write.
+
+    Patterns are matched against the end of the request path, e.g.
+    ``r"/bars/\d+/cocktails"``.
+    """
+    if CACHE is not None:
+        CACHE.invalidate(*patterns, bar_id=bar_id or default_bar_id())
+
+
+def build_cocktail_payload(arguments):
+    """Build the API payload for creating or updating a cocktail."""
+    payload = {
+        "name": arguments["name"],
+        "instructions": arguments["instructions"],
+        "ingredients": []
+    }
+    
+    # Process ingredients array
+    for ing in arguments["ingredients"]:
+        ingredient_entry = {
+            "ingredient_id": int(ing["ingredient_id"]),
+            "amount": float(ing["amount"])
+        }
+        if ing.get("units"):
+            ingredient_entry["units"] = ing["units"]
+        if ing.get("optional") is not None:
+            ingredient_entry["optional"] = ing["optional"]
+        if ing.get("note"):
+            ingredient_entry["note"] = ing["note"]
+        if ing.get("sort") is not None:
+            ingredient_entry["sort"] = int(ing["sort"])
+        payload["ingredients"].append(ingredient_entry)
+    
+    # Add optional fields if provided
+    if arguments.get("description"):
+        payload["description"] = arguments["description"]
+    if arguments.get("garnish"):
+        payload["garnish"] = arguments["garnish"]
+    if arguments.get("source"):
+        payload["source"] = arguments["source"]
+    if arguments.get("glass_id") is not None:
+        payload["glass_id"] = int(arguments["glass_id"])
+    if arguments.get("method_id") is not None:
+        payload["method_id"] = int(arguments["method_id"])
+    if arguments.get("tags"):
+        payload["tags"] = arguments["tags"]
+    
+    return payload
+
 
 def get_headers(bar_id=None):
     """Get HTTP headers with authentication."""
@@ -44,11 +992,12 @@ def get_headers(bar_id=None):
         "Accept": "application/json",
         "Content-Type": "application/json"
     }
-    if CONFIG["token"]:
-        headers["Authorization"] = f"Bearer {CONFIG['token']}"
+    token = current_tenant().token
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
     
-    # Use provided bar_id or fall back to config
-    active_bar_id = bar_id or CONFIG["bar_id"]
+    # Use provided bar_id or fall back to the session's default
+    active_bar_id = bar_id or default_bar_id()
     if active_bar_id:
         headers["Bar-Assistant-Bar-Id"] = str(int(active_bar_id))
     
@@ -70,685 +1019,820 @@ async def list_resources() -> list[Resource]:
             name="Bar Shelf Cocktails",
             mimeType="application/json",
             description="Cocktails you can make with ingredients on your bar shelf"
+        ),
+        Resource(
+            uri="bar://server/stats",
+            name="Server Statistics",
+            mimeType="application/json",
+            description="Rate limiter queue waits and cache statistics of this server"
         )
     ]
 
 
 @app.read_resource()
 async def read_resource(uri: str) -> str:
-    """Read bar shelf resources."""
-    async with httpx.AsyncClient() as client:
-        if uri == "bar://shelf/ingredients":
-            response = await client.get(
-                f"{CONFIG['api_url']}/ingredients",
-                headers=get_headers(),
-                params={"filter[bar_shelf]": "true"}
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            ingredients = data.get("data", [])
-            result = f"# Bar Shelf Ingredients ({len(ingredients)} total)\n\n"
-            for ing in ingredients:
-                result += f"- **{ing['name']}** (ID: {ing['id']})\n"
-            
-            return result
-            
-        elif uri == "bar://shelf/cocktails":
-            bar_id = CONFIG.get("bar_id")
-            if not bar_id:
-                return "# Error: No bar ID configured\n\nPlease set BAR_ASSISTANT_BAR_ID or use list_bars to find your bar ID."
-            
-            response = await client.get(
-                f"{CONFIG['api_url']}/bars/{int(bar_id)}/cocktails",
-                headers=get_headers()
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            cocktails = data.get("data", [])
-            result = f"# Cocktails You Can Make ({len(cocktails)} total)\n\n"
-            for cocktail in cocktails:
-                result += f"- **{cocktail['name']}**\n"
-                if cocktail.get('short_ingredients'):
-                    result += f"  Ingredients: {', '.join(cocktail['short_ingredients'])}\n"
-            
-            return result
+    """Read resources on behalf of the calling client."""
+    warm_up()
+    resource = str(uri).partition("?")[0]
+    with use_tenant(*session_context()), timed(f"resource:{resource}"), span(f"resource {resource}", **{"mcp.resource.uri": resource}):
+        return await handle_resource(uri)
+
+
+async def handle_resource(uri: str) -> str:
+    """Read bar shelf resources.
+
+    Query parameters on the URI select options, e.g.
+    ``bar://shelf/cocktails?format=json``.
+    """
+    uri, _, query = str(uri).partition("?")
+    options = dict(parse_qsl(query))
+    if uri == "bar://shelf/ingredients":
+        fetched = await fetch_listing(
+            f"{CONFIG['api_url']}/ingredients", None, {"filter[bar_shelf]": "true"}, {**options, "all_pages": True}
+        )
+        data = listing_result("ingredients", fetched, listing.parse_fields(options.get("fields")) or ["name"])
+        if output_format(options) == "json":
+            return render.to_json(data)
+        return render.shelf_ingredients_resource(data)
+        
+    elif uri == "bar://shelf/cocktails":
+        bar_id = default_bar_id()
+        if not bar_id:
+            return "# Error: No bar ID configured\n\nPlease set BAR_ASSISTANT_BAR_ID or use list_bars to find your bar ID."
+        
+        fetched = await fetch_listing(
+            f"{CONFIG['api_url']}/bars/{int(bar_id)}/cocktails", None, {}, {**options, "all_pages": True}
+        )
+        fields = listing.parse_fields(options.get("fields")) or ["name", "short_ingredients"]
+        data = listing_result("cocktails", fetched, fields)
+        if output_format(options) == "json":
+            return render.to_json(data)
+        return render.shelf_cocktails_resource(data)
+
+    elif uri == "bar://server/stats":
+        stats = {"rate_limiter": LIMITER.stats(), "coalesced_requests": REQUESTS.shared, "tenants": len(TENANTS)}
+        if CACHE is not None:
+            stats["cache"] = {
+                "entries": len(CACHE.entries),
+                "bytes": CACHE.size,
+                "hits": CACHE.hits,
+                "misses": CACHE.misses,
+                "revalidations": CACHE.revalidations
+            }
+        return json.dumps(stats, indent=2)
     
     raise ValueError(f"Unknown resource: {uri}")
 
 
-@app.list_tools()
-async def list_tools() -> list[Tool]:
-    """List available bar tools."""
-    return [
-        Tool(
-            name="list_bars",
-            description="List all bars you have access to and get their IDs",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="get_shelf_ingredients",
-            description="Get all ingredients currently on your bar shelf with detailed information",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "bar_id": {
-                        "type": "number",
-                        "description": "Bar ID (optional if BAR_ASSISTANT_BAR_ID is set)"
-                    },
-                    "page": {
-                        "type": "number",
-                        "description": "Page number for pagination (optional)"
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="get_shelf_cocktails",
-            description="Get all cocktails you can make with ingredients on your bar shelf",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "bar_id": {
-                        "type": "number",
-                        "description": "Bar ID (optional if BAR_ASSISTANT_BAR_ID is set)"
-                    },
-                    "page": {
-                        "type": "number",
-                        "description": "Page number for pagination (optional)"
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="add_ingredients_to_shelf",
-            description="Add ingredients to your bar shelf by their IDs",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "ingredient_ids": {
-                        "type": "array",
-                        "items": {"type": "number"},
-                        "description": "Array of ingredient IDs to add to shelf"
-                    },
-                    "bar_id": {
-                        "type": "number",
-                        "description": "Bar ID (optional if BAR_ASSISTANT_BAR_ID is set)"
-                    }
+# Accepted by every tool to pick between Markdown and compact JSON results
+OUTPUT_FORMAT_SCHEMA = {
+    "type": "string",
+    "enum": list(render.OUTPUT_FORMATS),
+    "description": "Result format: markdown (default) or compact json for programmatic use"
+}
+
+
+BAR_ID_PROPERTY = {
+    "type": "number",
+    "description": "Bar ID (optional if BAR_ASSISTANT_BAR_ID is set)"
+}
+
+
+# Accepted by the listing tools to pick fields and a window of the results
+LISTING_PROPERTIES = {
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Record fields to return besides the ID (optional, e.g. [\"name\"])"
+    },
+    "limit": {
+        "type": "number",
+        "description": "Maximum number of records to return (optional, capped by BAR_ASSISTANT_MAX_RESULTS)"
+    },
+    "offset": {
+        "type": "number",
+        "description": "Number of records to skip (optional)"
+    },
+    "sort": {
+        "type": "string",
+        "description": "Field to sort by, prefixed with - for descending order (optional, e.g. \"-name\")"
+    },
+    "cursor": {
+        "type": "string",
+        "description": "next_cursor from a previous result, to get the next records (optional)"
+    }
+}
+
+
+SHELF_LISTING_PROPERTIES = {
+    "bar_id": BAR_ID_PROPERTY,
+    "page": {
+        "type": "number",
+        "description": "Page number for pagination (optional)"
+    },
+    "all_pages": {
+        "type": "boolean",
+        "description": "Fetch every page and return the combined results (optional, ignores page)"
+    },
+    **LISTING_PROPERTIES
+}
+
+
+# Accepted by the multi-bar tools
+BARS_LISTING_PROPERTIES = {
+    "bar_ids": {
+        "anyOf": [
+            {"type": "array", "items": {"type": "number"}},
+            {"type": "string", "enum": ["all"]}
+        ],
+        "description": "Bar IDs to query, or \"all\" for every bar you have access to (optional, default \"all\")"
+    },
+    **{key: LISTING_PROPERTIES[key] for key in ("fields", "limit", "sort")}
+}
+
+
+# Accepted by the tools that list cocktails
+DETAILS_PROPERTY = {
+    "type": "boolean",
+    "description": "Also return each cocktail's recipe: ingredients with amounts and units, instructions, garnish, glass and method (optional). Saves looking up the cocktails one by one."
+}
+
+
+INGREDIENT_IDS_PROPERTY = {
+    "type": "array",
+    "items": {"type": "number"},
+}
+
+
+# Recipe fields shared by create_cocktail and update_cocktail
+COCKTAIL_PROPERTIES = {
+    "name": {
+        "type": "string",
+        "description": "Name of the cocktail (required)"
+    },
+    "instructions": {
+        "type": "string",
+        "description": "Step-by-step instructions for making the cocktail (required)"
+    },
+    "ingredients": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "ingredient_id": {
+                    "type": "number",
+                    "description": "ID of the ingredient (required)"
                 },
-                "required": ["ingredient_ids"]
-            }
-        ),
-        Tool(
-            name="remove_ingredients_from_shelf",
-            description="Remove ingredients from your bar shelf by their IDs",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "ingredient_ids": {
-                        "type": "array",
-                        "items": {"type": "number"},
-                        "description": "Array of ingredient IDs to remove from shelf"
-                    },
-                    "bar_id": {
-                        "type": "number",
-                        "description": "Bar ID (optional if BAR_ASSISTANT_BAR_ID is set)"
-                    }
+                "amount": {
+                    "type": "number",
+                    "description": "Amount of the ingredient (required)"
                 },
-                "required": ["ingredient_ids"]
-            }
-        ),
-        Tool(
-            name="search_ingredients",
-            description="Search for ingredients by name to find their IDs",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Ingredient name to search for"
-                    },
-                    "bar_id": {
-                        "type": "number",
-                        "description": "Bar ID (optional if BAR_ASSISTANT_BAR_ID is set)"
-                    }
+                "units": {
+                    "type": "string",
+                    "description": "Units for the amount (optional, e.g., 'ml', 'oz', 'dash')"
                 },
-                "required": ["name"]
-            }
-        ),
-        Tool(
-            name="create_ingredient",
-            description="Create a new ingredient in the bar database. Use this when an ingredient doesn't exist and needs to be created before adding to a cocktail.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Name of the ingredient (required)"
-                    },
-                    "strength": {
-                        "type": "number",
-                        "description": "Alcohol strength/percentage (optional, e.g., 40 for 40% ABV)"
-                    },
-                    "description": {
-                        "type": "string",
-                        "description": "Description of the ingredient (optional)"
-                    },
-                    "origin": {
-                        "type": "string",
-                        "description": "Origin/country of the ingredient (optional)"
-                    },
-                    "color": {
-                        "type": "string",
-                        "description": "Hex color code (optional, e.g., '#ffffff')"
-                    },
-                    "parent_ingredient_id": {
-                        "type": "number",
-                        "description": "Parent ingredient ID for categorization (optional)"
-                    },
-                    "units": {
-                        "type": "string",
-                        "description": "Default units for this ingredient (optional, e.g., 'ml', 'oz', 'dash')"
-                    },
-                    "bar_id": {
-                        "type": "number",
-                        "description": "Bar ID (optional if BAR_ASSISTANT_BAR_ID is set)"
-                    }
+                "optional": {
+                    "type": "boolean",
+                    "description": "Whether this ingredient is optional (optional)"
                 },
-                "required": ["name"]
-            }
-        ),
-        Tool(
-            name="create_cocktail",
-            description="Create a new cocktail recipe. First use search_ingredients to find ingredient IDs, then use create_ingredient for any missing ingredients.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Name of the cocktail (required)"
-                    },
-                    "instructions": {
-                        "type": "string",
-                        "description": "Step-by-step instructions for making the cocktail (required)"
-                    },
-                    "ingredients": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "ingredient_id": {
-                                    "type": "number",
-                                    "description": "ID of the ingredient (required)"
-                                },
-                                "amount": {
-                                    "type": "number",
-                                    "description": "Amount of the ingredient (required)"
-                                },
-                                "units": {
-                                    "type": "string",
-                                    "description": "Units for the amount (optional, e.g., 'ml', 'oz', 'dash')"
-                                },
-                                "optional": {
-                                    "type": "boolean",
-                                    "description": "Whether this ingredient is optional (optional)"
-                                },
-                                "note": {
-                                    "type": "string",
-                                    "description": "Additional note for this ingredient (optional)"
-                                },
-                                "sort": {
-                                    "type": "number",
-                                    "description": "Sort order for the ingredient (optional)"
-                                }
-                            },
-                            "required": ["ingredient_id", "amount"]
-                        },
-                        "description": "Array of ingredients with their IDs and amounts (required)"
-                    },
-                    "description": {
-                        "type": "string",
-                        "description": "Description of the cocktail (optional)"
-                    },
-                    "garnish": {
-                        "type": "string",
-                        "description": "Garnish for the cocktail (optional)"
-                    },
-                    "source": {
-                        "type": "string",
-                        "description": "Source/origin of the recipe (optional)"
-                    },
-                    "glass_id": {
-                        "type": "number",
-                        "description": "ID of the glass type to use (optional)"
-                    },
-                    "method_id": {
-                        "type": "number",
-                        "description": "ID of the mixing method - shaken, stirred, etc. (optional)"
-                    },
-                    "tags": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Array of tags for the cocktail (optional)"
-                    },
-                    "bar_id": {
-                        "type": "number",
-                        "description": "Bar ID (optional if BAR_ASSISTANT_BAR_ID is set)"
-                    }
+                "note": {
+                    "type": "string",
+                    "description": "Additional note for this ingredient (optional)"
                 },
-                "required": ["name", "instructions", "ingredients"]
-            }
-        ),
-        Tool(
-            name="update_cocktail",
-            description="Update an existing cocktail recipe. Use this to modify the name, instructions, ingredients, or other details of a cocktail.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "id": {
-                        "type": "number",
-                        "description": "ID of the cocktail to update (required)"
-                    },
-                    "name": {
-                        "type": "string",
-                        "description": "Name of the cocktail (required)"
-                    },
-                    "instructions": {
-                        "type": "string",
-                        "description": "Step-by-step instructions for making the cocktail (required)"
-                    },
-                    "ingredients": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "ingredient_id": {
-                                    "type": "number",
-                                    "description": "ID of the ingredient (required)"
-                                },
-                                "amount": {
-                                    "type": "number",
-                                    "description": "Amount of the ingredient (required)"
-                                },
-                                "units": {
-                                    "type": "string",
-                                    "description": "Units for the amount (optional, e.g., 'ml', 'oz', 'dash')"
-                                },
-                                "optional": {
-                                    "type": "boolean",
-                                    "description": "Whether this ingredient is optional (optional)"
-                                },
-                                "note": {
-                                    "type": "string",
-                                    "description": "Additional note for this ingredient (optional)"
-                                },
-                                "sort": {
-                                    "type": "number",
-                                    "description": "Sort order for the ingredient (optional)"
-                                }
-                            },
-                            "required": ["ingredient_id", "amount"]
-                        },
-                        "description": "Array of ingredients with their IDs and amounts (required)"
-                    },
-                    "description": {
-                        "type": "string",
-                        "description": "Description of the cocktail (optional)"
-                    },
-                    "garnish": {
-                        "type": "string",
-                        "description": "Garnish for the cocktail (optional)"
-                    },
-                    "source": {
-                        "type": "string",
-                        "description": "Source/origin of the recipe (optional)"
-                    },
-                    "glass_id": {
-                        "type": "number",
-                        "description": "ID of the glass type to use (optional)"
-                    },
-                    "method_id": {
-                        "type": "number",
-                        "description": "ID of the mixing method - shaken, stirred, etc. (optional)"
-                    },
-                    "tags": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Array of tags for the cocktail (optional)"
-                    },
-                    "bar_id": {
-                        "type": "number",
-                        "description": "Bar ID (optional if BAR_ASSISTANT_BAR_ID is set)"
-                    }
-                },
-                "required": ["id", "name", "instructions", "ingredients"]
-            }
-        )
+                "sort": {
+                    "type": "number",
+                    "description": "Sort order for the ingredient (optional)"
+                }
+            },
+            "required": ["ingredient_id", "amount"]
+        },
+        "description": "Array of ingredients with their IDs and amounts (required)"
+    },
+    "description": {
+        "type": "string",
+        "description": "Description of the cocktail (optional)"
+    },
+    "garnish": {
+        "type": "string",
+        "description": "Garnish for the cocktail (optional)"
+    },
+    "source": {
+        "type": "string",
+        "description": "Source/origin of the recipe (optional)"
+    },
+    "glass_id": {
+        "type": "number",
+        "description": "ID of the glass type to use (optional)"
+    },
+    "method_id": {
+        "type": "number",
+        "description": "ID of the mixing method - shaken, stirred, etc. (optional)"
+    },
+    "tags": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Array of tags for the cocktail (optional)"
+    },
+    "bar_id": BAR_ID_PROPERTY
+}
+
+
+TOOLS = ToolRegistry(common_properties={"format": OUTPUT_FORMAT_SCHEMA})
+
+
+def no_bar_id():
+    return [TextContent(
+        type="text",
+        text="Error: No bar ID provided. Use list_bars to find your bar ID or set BAR_ASSISTANT_BAR_ID."
+    )]
+
+
+@TOOLS.tool("list_bars", "List all bars you have access to and get their IDs")
+async def handle_list_bars(arguments):
+    bars = [
+        {"id": bar.get("id"), "name": bar.get("name"), "slug": bar.get("slug")}
+        for bar in await get_bars()
     ]
+    return reply(arguments, {"bars": bars}, render.bars)
+
+
+@TOOLS.tool(
+    "get_shelf_ingredients",
+    "Get all ingredients currently on your bar shelf with detailed information",
+    SHELF_LISTING_PROPERTIES
+)
+async def handle_get_shelf_ingredients(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+    if not bar_id:
+        return no_bar_id()
+
+    fetched = await fetch_listing(
+        f"{CONFIG['api_url']}/ingredients", bar_id, {"filter[bar_shelf]": "true"}, arguments
+    )
+    fields = listing.parse_fields(arguments.get("fields")) or ["name"]
+    return reply(arguments, listing_result("ingredients", fetched, fields), render.shelf_ingredients)
+
+
+@TOOLS.tool(
+    "get_shelf_cocktails",
+    "Get all cocktails you can make with ingredients on your bar shelf",
+    {**SHELF_LISTING_PROPERTIES, "details": DETAILS_PROPERTY}
+)
+async def handle_get_shelf_cocktails(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+    if not bar_id:
+        return no_bar_id()
+
+    fetched = await fetch_listing(f"{CONFIG['api_url']}/bars/{int(bar_id)}/cocktails", bar_id, {}, arguments)
+    fields = listing.parse_fields(arguments.get("fields")) or ["name", "short_ingredients"]
+    data = listing_result("cocktails", fetched, fields)
+    if arguments.get("details"):
+        data["cocktails"] = await hydrate_cocktails(bar_id, data["cocktails"])
+    return reply(arguments, data, render.shelf_cocktails)
+
+
+@TOOLS.tool(
+    "get_bars_shelf_ingredients",
+    "Get the shelf ingredients of several bars, or all of them, in one call. Bars are fetched concurrently and the results are grouped by bar. Use this to compare shelves. To see more of one bar's ingredients, pass its next_cursor to get_shelf_ingredients with that bar_id.",
+    BARS_LISTING_PROPERTIES
+)
+async def handle_get_bars_shelf_ingredients(arguments):
+    data = await bars_listing(
+        arguments, "ingredients", lambda bar_id: f"{CONFIG['api_url']}/ingredients", {"filter[bar_shelf]": "true"}, ["name"]
+    )
+    return reply(arguments, data, render.bars_shelf_ingredients)
 
 
-@app.call_tool()
+@TOOLS.tool(
+    "get_bars_shelf_cocktails",
+    "Get the cocktails each of several bars, or all of them, can make with their shelves, in one call. Bars are fetched concurrently and the results are grouped by bar. Use this to find which bar can make a cocktail. To see more of one bar's cocktails, pass its next_cursor to get_shelf_cocktails with that bar_id.",
+    {**BARS_LISTING_PROPERTIES, "details": DETAILS_PROPERTY}
+)
+async def handle_get_bars_shelf_cocktails(arguments):
+    data = await bars_listing(
+        arguments, "cocktails", lambda bar_id: f"{CONFIG['api_url']}/bars/{bar_id}/cocktails", {},
+        ["name", "short_ingredients"], hydrate=hydrate_cocktails if arguments.get("details") else None
+    )
+    return reply(arguments, data, render.bars_shelf_cocktails)
+
+
+@TOOLS.tool(
+    "what_can_i_make",
+    "Answer what-can-I-make questions locally: cocktails makeable now, cocktails missing exactly one ingredient, or the ingredients whose purchase would unlock the most cocktails. Use if_added to ask what you could make after buying something.",
+    {
+        "query": {
+            "type": "string",
+            "enum": ["makeable", "missing_one", "next_purchase"],
+            "description": "What to compute (optional, default 'makeable')"
+        },
+        "if_added": {
+            **INGREDIENT_IDS_PROPERTY,
+            "description": "Ingredient IDs to treat as if they were on the shelf (optional)"
+        },
+        "limit": {
+            "type": "number",
+            "description": "Maximum number of results (optional, default 50)"
+        },
+        "details": DETAILS_PROPERTY,
+        "bar_id": BAR_ID_PROPERTY
+    }
+)
+async def handle_what_can_i_make(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+    if not bar_id:
+        return no_bar_id()
+
+    engine, index = await asyncio.gather(ensure_engine(bar_id), ensure_index(bar_id))
+    query = arguments.get("query") or "makeable"
+    extra_ids = [int(id) for id in arguments.get("if_added") or []]
+    limit = int(arguments.get("limit") or 50)
+
+    def ingredient_ref(ingredient_id):
+        name = index.ingredients.get(ingredient_id, {}).get("name", f"Ingredient {ingredient_id}")
+        return {"id": ingredient_id, "name": name}
+
+    data = {"query": query, "if_added": extra_ids}
+    if query == "missing_one":
+        cocktails = engine.missing_one(extra_ids)
+        data["total"] = len(cocktails)
+        data["cocktails"] = [
+            {"id": cocktail_id, "name": cocktail_name, "missing": ingredient_ref(missing_id)}
+            for cocktail_id, cocktail_name, missing_id in cocktails[:limit]
+        ]
+    elif query == "next_purchase":
+        data["ingredients"] = [
+            {**ingredient_ref(ingredient_id), "unlocks": unlocked}
+            for ingredient_id, unlocked in engine.next_purchases(limit, extra_ids)
+        ]
+    else:
+        cocktails = engine.makeable(extra_ids)
+        data["total"] = len(cocktails)
+        data["cocktails"] = [
+            {"id": cocktail_id, "name": cocktail_name} for cocktail_id, cocktail_name in cocktails[:limit]
+        ]
+    if arguments.get("details") and data.get("cocktails"):
+        data["cocktails"] = await hydrate_cocktails(bar_id, data["cocktails"])
+
+    return reply(arguments, data, render.makeable)
+
+
+@TOOLS.tool(
+    "add_ingredients_to_shelf",
+    "Add ingredients to your bar shelf by their IDs",
+    {
+        "ingredient_ids": {**INGREDIENT_IDS_PROPERTY, "description": "Array of ingredient IDs to add to shelf"},
+        "bar_id": BAR_ID_PROPERTY
+    },
+    required=["ingredient_ids"]
+)
+async def handle_add_ingredients_to_shelf(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+    if not bar_id:
+        return no_bar_id()
+
+    ingredient_ids = [int(id) for id in arguments["ingredient_ids"]]
+
+    response = await get_client().post(
+        f"{CONFIG['api_url']}/bars/{int(bar_id)}/ingredients/batch-store",
+        headers=get_headers(bar_id),
+        json={"ingredients": ingredient_ids}
+    )
+    response.raise_for_status()
+    invalidate_cache(bar_id, r"/ingredients(/\d+)?", r"/bars/\d+/cocktails")
+    engine = current_tenant().engines.get(int(bar_id))
+    if engine is not None:
+        engine.add_to_shelf(ingredient_ids)
+
+    return reply(arguments, {"added": ingredient_ids}, render.shelf_change)
+
+
+@TOOLS.tool(
+    "remove_ingredients_from_shelf",
+    "Remove ingredients from your bar shelf by their IDs",
+    {
+        "ingredient_ids": {**INGREDIENT_IDS_PROPERTY, "description": "Array of ingredient IDs to remove from shelf"},
+        "bar_id": BAR_ID_PROPERTY
+    },
+    required=["ingredient_ids"]
+)
+async def handle_remove_ingredients_from_shelf(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+    if not bar_id:
+        return no_bar_id()
+
+    ingredient_ids = [int(id) for id in arguments["ingredient_ids"]]
+
+    response = await get_client().post(
+        f"{CONFIG['api_url']}/bars/{int(bar_id)}/ingredients/batch-delete",
+        headers=get_headers(bar_id),
+        json={"ingredients": ingredient_ids}
+    )
+    response.raise_for_status()
+    invalidate_cache(bar_id, r"/ingredients(/\d+)?", r"/bars/\d+/cocktails")
+    engine = current_tenant().engines.get(int(bar_id))
+    if engine is not None:
+        engine.remove_from_shelf(ingredient_ids)
+
+    return reply(arguments, {"removed": ingredient_ids}, render.shelf_change)
+
+
+@TOOLS.tool(
+    "search_ingredients",
+    "Search for ingredients by name to find their IDs",
+    {
+        "name": {
+            "type": "string",
+            "description": "Ingredient name to search for"
+        },
+        "bar_id": BAR_ID_PROPERTY
+    },
+    required=["name"]
+)
+async def handle_search_ingredients(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+
+    index = get_index(bar_id)
+    if index is not None:
+        ingredients = index.search(arguments["name"])
+    else:
+        response = await get_client().get(
+            f"{CONFIG['api_url']}/ingredients",
+            headers=get_headers(bar_id),
+            params={"filter[name]": arguments["name"]}
+        )
+        response.raise_for_status()
+        ingredients = response.json().get("data", [])
+
+    data = {
+        "ingredients": [
+            {**ingredient_summary(ing), "description": ing.get("description")} for ing in ingredients
+        ]
+    }
+    if not ingredients and index is not None:
+        data["closest"] = [
+            {**ingredient_summary(ing), "score": score} for ing, score in index.match(arguments["name"], limit=5)
+        ]
+    return reply(arguments, data, render.ingredient_search)
+
+
+@TOOLS.tool(
+    "match_ingredients",
+    "Find the closest ingredients to a possibly misspelled or paraphrased name, ranked with similarity scores. Use this when search_ingredients finds nothing.",
+    {
+        "name": {
+            "type": "string",
+            "description": "Ingredient name to match, e.g. 'angostura bitter'"
+        },
+        "limit": {
+            "type": "number",
+            "description": "Maximum number of candidates to return (optional, default 5)"
+        },
+        "bar_id": BAR_ID_PROPERTY
+    },
+    required=["name"]
+)
+async def handle_match_ingredients(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+    if not bar_id:
+        return no_bar_id()
+
+    index = await ensure_index(bar_id)
+    matches = index.match(arguments["name"], limit=int(arguments.get("limit") or 5))
+    data = {
+        "query": arguments["name"],
+        "matches": [{**ingredient_summary(ing), "score": score} for ing, score in matches]
+    }
+    return reply(arguments, data, render.ingredient_matches)
+
+
+@TOOLS.tool(
+    "resolve_ingredients",
+    "Resolve many ingredient names to their IDs in one call, e.g. before create_cocktail. Reports ambiguous and missing names, and can create the missing ingredients.",
+    {
+        "names": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Ingredient names to resolve"
+        },
+        "create_missing": {
+            "type": "boolean",
+            "description": "Create ingredients that don't exist yet (optional, default false)"
+        },
+        "bar_id": BAR_ID_PROPERTY
+    },
+    required=["names"]
+)
+async def handle_resolve_ingredients(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+    if not bar_id:
+        return no_bar_id()
+
+    resolution = await resolve_ingredient_names(
+        bar_id, arguments["names"], create_missing=bool(arguments.get("create_missing"))
+    )
+
+    data = {
+        "total": len(set(arguments["names"])),
+        "resolved": {
+            ing_name: {**ingredient_summary(ing), "created": ing_name in resolution["created"]}
+            for ing_name, ing in resolution["resolved"].items()
+        },
+        "ambiguous": {
+            ing_name: [ingredient_summary(ing) for ing in candidates]
+            for ing_name, candidates in resolution["ambiguous"].items()
+        },
+        "missing": resolution["missing"]
+    }
+    if resolution["errors"]:
+        data["errors"] = resolution["errors"]
+    return reply(arguments, data, render.resolution)
+
+
+@TOOLS.tool(
+    "create_ingredient",
+    "Create a new ingredient in the bar database. Use this when an ingredient doesn't exist and needs to be created before adding to a cocktail.",
+    {
+        "name": {
+            "type": "string",
+            "description": "Name of the ingredient (required)"
+        },
+        "strength": {
+            "type": "number",
+            "description": "Alcohol strength/percentage (optional, e.g., 40 for 40% ABV)"
+        },
+        "description": {
+            "type": "string",
+            "description": "Description of the ingredient (optional)"
+        },
+        "origin": {
+            "type": "string",
+            "description": "Origin/country of the ingredient (optional)"
+        },
+        "color": {
+            "type": "string",
+            "description": "Hex color code (optional, e.g., '#ffffff')"
+        },
+        "parent_ingredient_id": {
+            "type": "number",
+            "description": "Parent ingredient ID for categorization (optional)"
+        },
+        "units": {
+            "type": "string",
+            "description": "Default units for this ingredient (optional, e.g., 'ml', 'oz', 'dash')"
+        },
+        "bar_id": BAR_ID_PROPERTY
+    },
+    required=["name"]
+)
+async def handle_create_ingredient(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+
+    # Build the ingredient payload
+    payload = {
+        "name": arguments["name"]
+    }
+
+    # Add optional fields if provided
+    if arguments.get("strength") is not None:
+        payload["strength"] = float(arguments["strength"])
+    if arguments.get("description"):
+        payload["description"] = arguments["description"]
+    if arguments.get("origin"):
+        payload["origin"] = arguments["origin"]
+    if arguments.get("color"):
+        payload["color"] = arguments["color"]
+    if arguments.get("parent_ingredient_id") is not None:
+        payload["parent_ingredient_id"] = int(arguments["parent_ingredient_id"])
+    if arguments.get("units"):
+        payload["units"] = arguments["units"]
+
+    ingredient = await post_ingredient(bar_id, payload)
+    data = {
+        "ingredient": {
+            key: ingredient[key]
+            for key in ("id", "name", "strength", "description", "origin")
+            if ingredient.get(key) is not None
+        }
+    }
+    return reply(arguments, data, render.created_ingredient)
+
+
+@TOOLS.tool(
+    "create_cocktail",
+    "Create a new cocktail recipe. First use resolve_ingredients (or search_ingredients) to find ingredient IDs, then use create_ingredient for any missing ingredients.",
+    COCKTAIL_PROPERTIES,
+    required=["name", "instructions", "ingredients"]
+)
+async def handle_create_cocktail(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+
+    payload = build_cocktail_payload(arguments)
+    cocktail = await post_cocktail(bar_id, payload)
+    return reply(arguments, {"action": "created", "cocktail": cocktail_details(cocktail)}, render.saved_cocktail)
+
+
+@TOOLS.tool(
+    "bulk_create_cocktails",
+    "Create many cocktail recipes in one call. Ingredients can be given by name instead of ID; all names are resolved in one pass and the cocktails are submitted concurrently. Returns a per-cocktail success/failure report.",
+    {
+        "cocktails": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "description": "Cocktail with the same fields as create_cocktail; each ingredient may have 'name' instead of 'ingredient_id'"
+            },
+            "description": "Array of cocktail recipes (optional if jsonl is given)"
+        },
+        "jsonl": {
+            "type": "string",
+            "description": "Cocktail recipes as JSON Lines, one recipe per line (optional)"
+        },
+        "create_missing_ingredients": {
+            "type": "boolean",
+            "description": "Create ingredients that don't exist yet (optional, default false)"
+        },
+        "bar_id": BAR_ID_PROPERTY
+    }
+)
+async def handle_bulk_create_cocktails(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+
+    recipes = list(arguments.get("cocktails") or [])
+    if arguments.get("jsonl"):
+        from .bulk import parse_recipes
+
+        recipes.extend(parse_recipes(arguments["jsonl"]))
+    if not recipes:
+        return [TextContent(type="text", text="Error: No cocktails provided. Pass cocktails or jsonl.")]
+
+    report, created = await bulk_create_cocktails(
+        bar_id, recipes, create_missing=bool(arguments.get("create_missing_ingredients"))
+    )
+    return reply(arguments, bulk_report_data(report, created), render.bulk_report)
+
+
+@TOOLS.tool(
+    "update_cocktail",
+    "Update an existing cocktail recipe. Use this to modify the name, instructions, ingredients, or other details of a cocktail.",
+    {
+        "id": {
+            "type": "number",
+            "description": "ID of the cocktail to update (required)"
+        },
+        **COCKTAIL_PROPERTIES
+    },
+    required=["id", "name", "instructions", "ingredients"]
+)
+async def handle_update_cocktail(arguments):
+    bar_id = arguments.get("bar_id") or default_bar_id()
+    cocktail_id = int(arguments["id"])
+
+    payload = build_cocktail_payload(arguments)
+
+    response = await get_client().put(
+        f"{CONFIG['api_url']}/cocktails/{cocktail_id}",
+        headers=get_headers(bar_id),
+        json=payload
+    )
+    response.raise_for_status()
+    invalidate_cache(bar_id, r"/cocktails", rf"/cocktails/{cocktail_id}", r"/bars/\d+/cocktails")
+    data = response.json()
+
+    engine = current_tenant().engines.get(int(bar_id)) if bar_id else None
+    if engine is not None:
+        engine.set_cocktail({**payload, "id": cocktail_id})
+
+    cocktail = data.get("data", {})
+    return reply(arguments, {"action": "updated", "cocktail": cocktail_details(cocktail)}, render.saved_cocktail)
+
+
+@app.list_tools()
+async def list_tools() -> list[Tool]:
+    """List available bar tools."""
+    return TOOLS.definitions()
+
+
+try:
+    # Arguments are validated by the registry, with validators compiled once
+    register_call_tool = app.call_tool(validate_input=False)
+except TypeError:
+    # Older SDKs don't validate tool arguments at all
+    register_call_tool = app.call_tool()
+
+
+@register_call_tool
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
-    """Handle tool calls."""
-    async with httpx.AsyncClient() as client:
-        
-        if name == "list_bars":
-            response = await client.get(
-                f"{CONFIG['api_url']}/bars",
-                headers=get_headers()
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            result = "Available bars:\n\n"
-            for bar in data.get('data', []):
-                result += f"**{bar['name']}** (ID: {bar['id']})\n"
-                result += f"  Slug: {bar['slug']}\n\n"
-            
-            return [TextContent(type="text", text=result)]
-        
-        if name == "get_shelf_ingredients":
-            bar_id = arguments.get("bar_id") or CONFIG["bar_id"]
-            if not bar_id:
-                return [TextContent(
-                    type="text",
-                    text="Error: No bar ID provided. Use list_bars to find your bar ID or set BAR_ASSISTANT_BAR_ID."
-                )]
-            
-            params = {"filter[bar_shelf]": "true"}
-            if arguments.get("page"):
-                params["page"] = arguments["page"]
-            
-            response = await client.get(
-                f"{CONFIG['api_url']}/ingredients",
-                headers=get_headers(bar_id),
-                params=params
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            return [TextContent(
-                type="text",
-                text=f"Found {len(data.get('data', []))} ingredients on your bar shelf:\n\n" + 
-                     "\n".join([f"- {ing['name']} (ID: {ing['id']})" for ing in data.get('data', [])])
-            )]
-        
-        elif name == "get_shelf_cocktails":
-            bar_id = arguments.get("bar_id") or CONFIG["bar_id"]
-            if not bar_id:
-                return [TextContent(
-                    type="text",
-                    text="Error: No bar ID provided. Use list_bars to find your bar ID or set BAR_ASSISTANT_BAR_ID."
-                )]
-            
-            params = {}
-            if arguments.get("page"):
-                params["page"] = arguments["page"]
-            
-            response = await client.get(
-                f"{CONFIG['api_url']}/bars/{int(bar_id)}/cocktails",
-                headers=get_headers(bar_id),
-                params=params
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            result = f"You can make {len(data.get('data', []))} cocktails:\n\n"
-            for cocktail in data.get('data', []):
-                result += f"**{cocktail['name']}** (ID: {cocktail['id']})\n"
-                if cocktail.get('short_ingredients'):
-                    result += f"  • {', '.join(cocktail['short_ingredients'])}\n"
-            
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "add_ingredients_to_shelf":
-            bar_id = arguments.get("bar_id") or CONFIG["bar_id"]
-            if not bar_id:
-                return [TextContent(
-                    type="text",
-                    text="Error: No bar ID provided. Use list_bars to find your bar ID or set BAR_ASSISTANT_BAR_ID."
-                )]
-            
-            ingredient_ids = [int(id) for id in arguments["ingredient_ids"]]
-            
-            response = await client.post(
-                f"{CONFIG['api_url']}/bars/{int(bar_id)}/ingredients/batch-store",
-                headers=get_headers(bar_id),
-                json={"ingredients": ingredient_ids}
-            )
-            response.raise_for_status()
-            
-            return [TextContent(
-                type="text",
-                text=f"Successfully added {len(ingredient_ids)} ingredients to your bar shelf!"
-            )]
-        
-        elif name == "remove_ingredients_from_shelf":
-            bar_id = arguments.get("bar_id") or CONFIG["bar_id"]
-            if not bar_id:
-                return [TextContent(
-                    type="text",
-                    text="Error: No bar ID provided. Use list_bars to find your bar ID or set BAR_ASSISTANT_BAR_ID."
-                )]
-            
-            ingredient_ids = [int(id) for id in arguments["ingredient_ids"]]
-            
-            response = await client.post(
-                f"{CONFIG['api_url']}/bars/{int(bar_id)}/ingredients/batch-delete",
-                headers=get_headers(bar_id),
-                json={"ingredients": ingredient_ids}
-            )
-            response.raise_for_status()
-            
-            return [TextContent(
-                type="text",
-                text=f"Successfully removed {len(ingredient_ids)} ingredients from your bar shelf!"
-            )]
-        
-        elif name == "search_ingredients":
-            bar_id = arguments.get("bar_id") or CONFIG["bar_id"]
-            
-            response = await client.get(
-                f"{CONFIG['api_url']}/ingredients",
-                headers=get_headers(bar_id),
-                params={"filter[name]": arguments["name"]}
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if not data.get('data'):
-                return [TextContent(type="text", text="No ingredients found matching your search.")]
-            
-            result = "Found ingredients:\n\n"
-            for ing in data.get('data', []):
-                result += f"- **{ing['name']}** (ID: {ing['id']})\n"
-                if ing.get('description'):
-                    result += f"  {ing['description'][:100]}...\n"
-            
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "create_ingredient":
-            bar_id = arguments.get("bar_id") or CONFIG["bar_id"]
-            
-            # Build the ingredient payload
-            payload = {
-                "name": arguments["name"]
-            }
-            
-            # Add optional fields if provided
-            if arguments.get("strength") is not None:
-                payload["strength"] = float(arguments["strength"])
-            if arguments.get("description"):
-                payload["description"] = arguments["description"]
-            if arguments.get("origin"):
-                payload["origin"] = arguments["origin"]
-            if arguments.get("color"):
-                payload["color"] = arguments["color"]
-            if arguments.get("parent_ingredient_id") is not None:
-                payload["parent_ingredient_id"] = int(arguments["parent_ingredient_id"])
-            if arguments.get("units"):
-                payload["units"] = arguments["units"]
-            
-            response = await client.post(
-                f"{CONFIG['api_url']}/ingredients",
-                headers=get_headers(bar_id),
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            ingredient = data.get("data", {})
-            result = f"Successfully created ingredient!\n\n"
-            result += f"**{ingredient.get('name')}** (ID: {ingredient.get('id')})\n"
-            if ingredient.get('strength'):
-                result += f"  Strength: {ingredient.get('strength')}%\n"
-            if ingredient.get('description'):
-                result += f"  Description: {ingredient.get('description')}\n"
-            if ingredient.get('origin'):
-                result += f"  Origin: {ingredient.get('origin')}\n"
-            
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "create_cocktail":
-            bar_id = arguments.get("bar_id") or CONFIG["bar_id"]
-            
-            # Build the cocktail payload
-            payload = {
-                "name": arguments["name"],
-                "instructions": arguments["instructions"],
-                "ingredients": []
-            }
-            
-            # Process ingredients array
-            for ing in arguments["ingredients"]:
-                ingredient_entry = {
-                    "ingredient_id": int(ing["ingredient_id"]),
-                    "amount": float(ing["amount"])
-                }
-                if ing.get("units"):
-                    ingredient_entry["units"] = ing["units"]
-                if ing.get("optional") is not None:
-                    ingredient_entry["optional"] = ing["optional"]
-                if ing.get("note"):
-                    ingredient_entry["note"] = ing["note"]
-                if ing.get("sort") is not None:
-                    ingredient_entry["sort"] = int(ing["sort"])
-                payload["ingredients"].append(ingredient_entry)
-            
-            # Add optional fields if provided
-            if arguments.get("description"):
-                payload["description"] = arguments["description"]
-            if arguments.get("garnish"):
-                payload["garnish"] = arguments["garnish"]
-            if arguments.get("source"):
-                payload["source"] = arguments["source"]
-            if arguments.get("glass_id") is not None:
-                payload["glass_id"] = int(arguments["glass_id"])
-            if arguments.get("method_id") is not None:
-                payload["method_id"] = int(arguments["method_id"])
-            if arguments.get("tags"):
-                payload["tags"] = arguments["tags"]
-            
-            response = await client.post(
-                f"{CONFIG['api_url']}/cocktails",
-                headers=get_headers(bar_id),
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            cocktail = data.get("data", {})
-            result = f"Successfully created cocktail!\n\n"
-            result += f"**{cocktail.get('name')}** (ID: {cocktail.get('id')})\n"
-            if cocktail.get('description'):
-                result += f"  Description: {cocktail.get('description')}\n"
-            if cocktail.get('garnish'):
-                result += f"  Garnish: {cocktail.get('garnish')}\n"
-            if cocktail.get('instructions'):
-                result += f"\n**Instructions:**\n{cocktail.get('instructions')}\n"
-            
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "update_cocktail":
-            bar_id = arguments.get("bar_id") or CONFIG["bar_id"]
-            cocktail_id = int(arguments["id"])
-            
-            # Build the cocktail payload
-            payload = {
-                "name": arguments["name"],
-                "instructions": arguments["instructions"],
-                "ingredients": []
-            }
-            
-            # Process ingredients array
-            for ing in arguments["ingredients"]:
-                ingredient_entry = {
-                    "ingredient_id": int(ing["ingredient_id"]),
-                    "amount": float(ing["amount"])
-                }
-                if ing.get("units"):
-                    ingredient_entry["units"] = ing["units"]
-                if ing.get("optional") is not None:
-                    ingredient_entry["optional"] = ing["optional"]
-                if ing.get("note"):
-                    ingredient_entry["note"] = ing["note"]
-                if ing.get("sort") is not None:
-                    ingredient_entry["sort"] = int(ing["sort"])
-                payload["ingredients"].append(ingredient_entry)
-            
-            # Add optional fields if provided
-            if arguments.get("description"):
-                payload["description"] = arguments["description"]
-            if arguments.get("garnish"):
-                payload["garnish"] = arguments["garnish"]
-            if arguments.get("source"):
-                payload["source"] = arguments["source"]
-            if arguments.get("glass_id") is not None:
-                payload["glass_id"] = int(arguments["glass_id"])
-            if arguments.get("method_id") is not None:
-                payload["method_id"] = int(arguments["method_id"])
-            if arguments.get("tags"):
-                payload["tags"] = arguments["tags"]
-            
-            response = await client.put(
-                f"{CONFIG['api_url']}/cocktails/{cocktail_id}",
-                headers=get_headers(bar_id),
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            cocktail = data.get("data", {})
-            result = f"Successfully updated cocktail!\n\n"
-            result += f"**{cocktail.get('name')}** (ID: {cocktail.get('id')})\n"
-            if cocktail.get('description'):
-                result += f"  Description: {cocktail.get('description')}\n"
-            if cocktail.get('garnish'):
-                result += f"  Garnish: {cocktail.get('garnish')}\n"
-            if cocktail.get('instructions'):
-                result += f"\n**Instructions:**\n{cocktail.get('instructions')}\n"
-            
-            return [TextContent(type="text", text=result)]
-    
-    raise ValueError(f"Unknown tool: {name}")
+    """Handle tool calls on behalf of the calling client."""
+    warm_up()
+    with use_tenant(*session_context()), timed(name), span(f"tool {name}", **{"mcp.tool.name": name}):
+        return await TOOLS.call(name, arguments or {})
 
 
 async def run_server():
     """Run the MCP server."""
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    if CONFIG["tracing"] in EXPORTERS:
+        setup_tracing(CONFIG["tracing"], CONFIG["trace_file"])
+    refresh_task = None
+    if CONFIG["index"]:
+        refresh_task = asyncio.create_task(sync_local_data())
+    if METRICS is not None:
+        if CONFIG["metrics_port"] and CONFIG["transport"] == "stdio":
+            spawn(serve_metrics(METRICS, CONFIG["host"], CONFIG["metrics_port"]))
+        if CONFIG["metrics_file"]:
+            spawn(dump_metrics(METRICS, CONFIG["metrics_file"], CONFIG["metrics_interval"]))
+    try:
+        if CONFIG["transport"] == "stdio":
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await app.run(
+                    read_stream,
+                    write_stream,
+                    app.create_initialization_options()
+                )
+        else:
+            await serve(create_app(app, CONFIG["transport"], metrics=METRICS), CONFIG["host"], CONFIG["port"])
+    finally:
+        if refresh_task is not None:
+            refresh_task.cancel()
+        for tenant in TENANTS:
+            for task in tenant.index_loads.values():
+                task.cancel()
+        for task in list(_background_tasks):
+            task.cancel()
+        await close_client()
+        if SNAPSHOT is not None:
+            SNAPSHOT.close()
+        shutdown_tracing()
+
+
+async def run_import(argv):
+    """Import cocktail recipes from a JSON or JSONL file."""
+    import argparse
+    from .bulk import parse_recipes
+
+    parser = argparse.ArgumentParser(
+        prog="bar-assistant-mcp import",
+        description="Create cocktails from a JSON or JSONL file of recipes"
+    )
+    parser.add_argument("file", help="Path to the recipes file, or - to read from stdin")
+    parser.add_argument("--bar-id", help="Bar ID (defaults to BAR_ASSISTANT_BAR_ID)")
+    parser.add_argument("--create-missing", action="store_true", help="Create ingredients that don't exist yet")
+    parser.add_argument("--concurrency", type=int, help="Cocktails submitted at once")
+    parser.add_argument("--rate", type=float, help="Maximum submissions started per second")
+    parser.add_argument("--retries", type=int, help="Retries for throttled or failed requests")
+    args = parser.parse_args(argv)
+    
+    if args.concurrency is not None:
+        CONFIG["bulk_concurrency"] = args.concurrency
+    if args.rate is not None:
+        CONFIG["bulk_rate"] = args.rate
+    if args.retries is not None:
+        CONFIG["retries"] = args.retries
+    bar_id = args.bar_id or CONFIG["bar_id"]
+    if not bar_id:
+        parser.error("No bar ID provided. Use --bar-id or set BAR_ASSISTANT_BAR_ID.")
+    
+    text = sys.stdin.read() if args.file == "-" else Path(args.file).read_text()
+    try:
+        report, created = await bulk_create_cocktails(bar_id, parse_recipes(text), create_missing=args.create_missing)
+    finally:
+        await close_client()
+    
+    print(format_bulk_report(report, created))
+    return 0 if all(ok for _, ok, _ in report) else 1
+
+
+def run_serve(argv):
+    """Serve many MCP clients from one process over a network transport."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="bar-assistant-mcp serve",
+        description="Run one shared server for many MCP clients over HTTP"
+    )
+    parser.add_argument(
+        "--transport", choices=TRANSPORTS[1:],
+        help="Streamable HTTP (served at /mcp) or SSE (served at /sse); defaults to http"
+    )
+    parser.add_argument("--host", help="Address to listen on (defaults to BAR_ASSISTANT_HOST)")
+    parser.add_argument("--port", type=int, help="Port to listen on (defaults to BAR_ASSISTANT_PORT)")
+    args = parser.parse_args(argv)
+    
+    CONFIG["transport"] = args.transport or (CONFIG["transport"] if CONFIG["transport"] != "stdio" else "http")
+    if args.host is not None:
+        CONFIG["host"] = args.host
+    if args.port is not None:
+        CONFIG["port"] = args.port
+    asyncio.run(run_server())
 
 
 def main():
     """Main entry point."""
+    if len(sys.argv) > 1 and sys.argv[1] == "import":
+        sys.exit(asyncio.run(run_import(sys.argv[2:])))
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        return run_serve(sys.argv[2:])
+    if CONFIG["transport"] not in TRANSPORTS:
+        sys.exit(f"Unknown transport {CONFIG['transport']!r}; use one of: {', '.join(TRANSPORTS)}")
     asyncio.run(run_server())
 
 
@@ -0,0 +1,78 @@
+"""Coalescing of identical concurrent calls into a single upstream call."""
+
+import asyncio
+
+import httpx
+
+from .cache import cache_key, read_raw
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared call whose caller was cancelled before it finished."""
+
+
+class SingleFlight:
+    """Run at most one call per key at a time, sharing its result with waiters."""
+
+    def __init__(self):
+        self._calls: dict[object, asyncio.Future] = {}
+        self.shared = 0
+
+    async def do(self, key, fn):
+        """Await ``fn()``, or the in-flight call for ``key`` if there is one.
+
+        If the caller running a shared call is cancelled, the cancellation
+        is not passed on: one of its waiters runs ``fn()`` again instead.
+        """
+        while (future := self._calls.get(key)) is not None:
+            self.shared += 1
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+class SingleFlightTransport(httpx.AsyncBaseTransport):
+    """Transport that shares one upstream response among identical GET requests.
+
+    Requests are identical when they would share a cache entry: same
+    endpoint, query parameters, bar and credentials.
+    """
+
+    def __init__(self, transport, flight):
+        self._transport = transport
+        self._flight = flight
+
+    async def handle_async_request(self, request):
+        if request.method != "GET":
+            return await self._transport.handle_async_request(request)
+
+        async def fetch():
+            response = await self._transport.handle_async_request(request)
+            return response.status_code, response.headers, await read_raw(response)
+
+        status_code, headers, content = await self._flight.do(cache_key(request), fetch)
+        # Pass the body on still encoded, as it came from the API, so it matches its headers
+        return httpx.Response(status_code, headers=headers, stream=httpx.ByteStream(content), request=request)
+
+    async def aclose(self):
+        await self._transport.aclose()
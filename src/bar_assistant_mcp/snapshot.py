@@ -0,0 +1,116 @@
+"""Persistent on-disk snapshot of the bar catalog for warm starts."""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    api_url TEXT NOT NULL,
+    bar_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (api_url, bar_id, kind, id)
+);
+CREATE TABLE IF NOT EXISTS syncs (
+    api_url TEXT NOT NULL,
+    bar_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (api_url, bar_id, kind)
+);
+"""
+
+
+class Snapshot:
+    """SQLite store of catalog records keyed by API URL, bar ID and kind.
+
+    Each record is stored as a JSON row, so a refresh only rewrites the
+    records that actually changed. Records that are not tied to a bar,
+    like the list of bars itself, use bar ID 0.
+    """
+
+    # Raised for unreadable or unwritable snapshots
+    Error = sqlite3.Error
+
+    def __init__(self, path):
+        self.path = Path(path).expanduser()
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def load(self, api_url, bar_id, kind):
+        """Get the stored records of a kind, or None if it was never synced."""
+        with self._lock:
+            conn = self._connect()
+            synced = conn.execute(
+                "SELECT 1 FROM syncs WHERE api_url = ? AND bar_id = ? AND kind = ?",
+                (api_url, bar_id, kind)
+            ).fetchone()
+            if synced is None:
+                return None
+            rows = conn.execute(
+                "SELECT data FROM records WHERE api_url = ? AND bar_id = ? AND kind = ? ORDER BY id",
+                (api_url, bar_id, kind)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def save(self, api_url, bar_id, kind, records):
+        """Replace the stored records of a kind, writing only what changed.
+
+        Returns the number of records written and deleted.
+        """
+        new = {int(record["id"]): json.dumps(record, separators=(",", ":"), sort_keys=True) for record in records}
+        with self._lock:
+            conn = self._connect()
+            old = dict(conn.execute(
+                "SELECT id, data FROM records WHERE api_url = ? AND bar_id = ? AND kind = ?",
+                (api_url, bar_id, kind)
+            ).fetchall())
+            changed = [(api_url, bar_id, kind, id, data) for id, data in new.items() if old.get(id) != data]
+            deleted = [(api_url, bar_id, kind, id) for id in old.keys() - new.keys()]
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)", changed)
+                conn.executemany(
+                    "DELETE FROM records WHERE api_url = ? AND bar_id = ? AND kind = ? AND id = ?", deleted
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?, ?)", (api_url, bar_id, kind, time.time())
+                )
+        return len(changed), len(deleted)
+
+    def upsert(self, api_url, bar_id, kind, records):
+        """Write changed records without touching the others."""
+        rows = [
+            (api_url, bar_id, kind, int(record["id"]), json.dumps(record, separators=(",", ":"), sort_keys=True))
+            for record in records
+        ]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)", rows)
+
+    def synced_at(self, api_url, bar_id, kind):
+        """Get the wall-clock time of the last full save of a kind, if any."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT synced_at FROM syncs WHERE api_url = ? AND bar_id = ? AND kind = ?",
+                (api_url, bar_id, kind)
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
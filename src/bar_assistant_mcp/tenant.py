@@ -0,0 +1,80 @@
+"""Per-tenant credentials and local catalogs for a shared server."""
+
+import contextlib
+import contextvars
+import hashlib
+
+from .sync import CatalogSync
+
+
+def token_key(token):
+    """Get a short, non-reversible key identifying an API token."""
+    return hashlib.sha256((token or "").encode()).hexdigest()[:16]
+
+
+class Tenant:
+    """One API token, with the local catalogs built from what it can see.
+
+    Indexes, engines and sync marks are kept per tenant so that a client
+    never gets answers computed from another user's data. ``scope``
+    namespaces the tenant's records in the on-disk snapshot.
+    """
+
+    def __init__(self, token, scope, reconcile_interval=3600.0):
+        self.token = token
+        self.key = token_key(token)
+        self.scope = scope
+        self.indexes = {}
+        self.index_loads = {}
+        self.engines = {}
+        self.sync = CatalogSync(reconcile_interval=reconcile_interval)
+        # Bars restored from the snapshot, served once while a fresh list loads
+        self.snapshot_bars = None
+
+
+class TenantRegistry:
+    """Tenants of one API instance, created on first use of their token.
+
+    The server's own token keeps the plain API URL as its snapshot scope,
+    so snapshots written before tenants existed stay valid.
+    """
+
+    def __init__(self, api_url, default_token=None, reconcile_interval=3600.0):
+        self.api_url = api_url
+        self.default_token = default_token
+        self.reconcile_interval = reconcile_interval
+        self._tenants: dict[str, Tenant] = {}
+
+    def get(self, token=None):
+        key = token_key(token)
+        tenant = self._tenants.get(key)
+        if tenant is None:
+            scope = self.api_url if token == self.default_token else f"{self.api_url}#{key}"
+            tenant = Tenant(token, scope, self.reconcile_interval)
+            self._tenants[key] = tenant
+        return tenant
+
+    def __iter__(self):
+        return iter(list(self._tenants.values()))
+
+    def __len__(self):
+        return len(self._tenants)
+
+
+# Tenant and default bar ID of the request being handled
+_current: contextvars.ContextVar[tuple[Tenant, str | None]] = contextvars.ContextVar("tenant")
+
+
+@contextlib.contextmanager
+def use_tenant(tenant, bar_id=None):
+    """Handle everything inside the block on behalf of ``tenant``."""
+    reset = _current.set((tenant, bar_id))
+    try:
+        yield tenant
+    finally:
+        _current.reset(reset)
+
+
+def current():
+    """Get the active ``(tenant, bar_id)`` pair, or None outside a request."""
+    return _current.get(None)
@@ -0,0 +1,73 @@
+"""Declarative registry of the server's MCP tools.
+
+Each tool is declared once, next to its handler, with the properties of
+its input schema. The registry builds every ``Tool`` definition once, at
+registration, compiles a tool's argument validator on its first call, and
+dispatches calls through a dict.
+"""
+
+import jsonschema
+from mcp.types import Tool
+
+
+class ToolRegistry:
+    """Tools by name, with their definitions, validators and handlers.
+
+    ``common_properties`` are added to the input schema of every tool,
+    after the tool's own properties.
+    """
+
+    def __init__(self, common_properties=None):
+        self.common_properties = dict(common_properties or {})
+        self._tools = {}
+        self._validators = {}
+        self._definitions = None
+
+    def tool(self, name, description, properties=None, required=()):
+        """Register the decorated async function as the handler of a tool.
+
+        The handler is called with the tool's arguments once they have
+        been validated against its input schema.
+        """
+        schema = {"type": "object", "properties": {**(properties or {}), **self.common_properties}}
+        if required:
+            schema["required"] = list(required)
+
+        def decorate(handler):
+            if name in self._tools:
+                raise ValueError(f"Tool {name!r} is already registered")
+            definition = Tool(name=name, description=description, inputSchema=schema)
+            self._tools[name] = (definition, handler)
+            self._definitions = None
+            return handler
+        return decorate
+
+    def definitions(self):
+        """Get the ``Tool`` definitions of every tool, in registration order."""
+        if self._definitions is None:
+            self._definitions = [definition for definition, _ in self._tools.values()]
+        return self._definitions
+
+    def validate(self, name, arguments):
+        """Get the most relevant problem with a tool's arguments, or None if they are valid.
+
+        Schemas are static code, so they aren't checked against the
+        meta-schema; that alone would cost every cold start tens of
+        milliseconds.
+        """
+        validator = self._validators.get(name)
+        if validator is None:
+            schema = self._tools[name][0].inputSchema
+            validator = self._validators[name] = jsonschema.validators.validator_for(schema)(schema)
+        if validator.is_valid(arguments):
+            return None
+        return jsonschema.exceptions.best_match(validator.iter_errors(arguments)).message
+
+    async def call(self, name, arguments):
+        """Validate a tool's arguments and run its handler."""
+        if name not in self._tools:
+            raise ValueError(f"Unknown tool: {name}")
+        problem = self.validate(name, arguments)
+        if problem is not None:
+            raise ValueError(f"Input validation error: {problem}")
+        return await self._tools[name][1](arguments)
@@ -0,0 +1,119 @@
+"""Optional OpenTelemetry tracing of tool calls and API requests.
+
+Tracing is off unless ``setup_tracing`` is called, in which case every
+tool call becomes a span with child spans for local work and for each
+outgoing API request. Without the OpenTelemetry SDK installed, all of
+this is a no-op.
+"""
+
+import contextlib
+import logging
+import sys
+
+import httpx
+
+from .metrics import endpoint_label
+
+
+logger = logging.getLogger(__name__)
+
+EXPORTERS = ("otlp", "console", "file")
+
+_tracer = None
+_provider = None
+
+
+def setup_tracing(exporter="otlp", path=None, service_name="bar-assistant-mcp"):
+    """Install a tracer provider exporting spans with ``exporter``.
+
+    ``otlp`` sends spans to the collector configured by the standard
+    ``OTEL_EXPORTER_OTLP_*`` variables, and falls back to ``console`` if
+    the OTLP exporter isn't installed. ``console`` writes spans as JSON
+    lines to stderr, and ``file`` appends them to ``path``, for offline
+    use.
+    """
+    global _tracer, _provider
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError as e:
+        raise RuntimeError(
+            "Tracing requires the OpenTelemetry SDK. "
+            "Install it with: pip install 'bar-assistant-mcp[tracing]'"
+        ) from e
+
+    span_exporter = None
+    if exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            span_exporter = OTLPSpanExporter()
+        except ImportError:
+            logger.warning("OTLP exporter not installed, writing spans to %s instead", path or "stderr")
+    if span_exporter is None:
+        # Never stdout: in stdio mode it carries the MCP protocol
+        out = open(path, "a") if path else sys.stderr
+        span_exporter = ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(_provider)
+    _tracer = trace.get_tracer("bar_assistant_mcp")
+
+
+def shutdown_tracing():
+    """Flush spans that haven't been exported yet."""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def span(name, **attributes):
+    """Run the block in a span, or do nothing if tracing is off."""
+    if _tracer is None:
+        return contextlib.nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def record_retry(request):
+    """Note a retry on the span of the request being retried."""
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    trace.get_current_span().add_event("retry", {"http.request.method": request.method})
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """Transport wrapping every API request in a client span.
+
+    The trace context is propagated to the API in ``traceparent``
+    headers, which don't take part in cache or coalescing keys.
+    """
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        if _tracer is None:
+            return await self._transport.handle_async_request(request)
+
+        from opentelemetry import propagate
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+
+        attributes = {
+            "http.request.method": request.method,
+            "url.full": str(request.url.copy_with(query=None)),
+            "server.address": request.url.host,
+        }
+        name = f"{request.method} {endpoint_label(request.url.path)}"
+        with _tracer.start_as_current_span(name, kind=SpanKind.CLIENT, attributes=attributes) as current:
+            propagate.inject(request.headers)
+            response = await self._transport.handle_async_request(request)
+            current.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 400:
+                current.set_status(Status(StatusCode.ERROR))
+            return response
+
+    async def aclose(self):
+        await self._transport.aclose()
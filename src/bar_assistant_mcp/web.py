@@ -0,0 +1,86 @@
+"""Network transports that let one server process serve many MCP clients."""
+
+import contextlib
+
+
+TRANSPORTS = ("stdio", "http", "sse")
+
+
+class _StreamableHTTPEndpoint:
+    """ASGI endpoint handing every request to the streamable HTTP session manager."""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def __call__(self, scope, receive, send):
+        await self.manager.handle_request(scope, receive, send)
+
+
+def create_app(server, transport="http", path="/mcp", metrics=None):
+    """Build an ASGI app serving ``server`` over streamable HTTP or SSE.
+
+    Every client gets its own MCP session, while all sessions share the
+    process: the pooled HTTP client, response cache, rate limiter and
+    local catalogs stay warm between conversations. When ``metrics`` are
+    given they are served at ``/metrics``.
+    """
+    try:
+        from starlette.applications import Starlette
+        from starlette.responses import Response
+        from starlette.routing import Mount, Route
+    except ImportError as e:
+        raise RuntimeError(
+            "Network transports require 'starlette' and 'uvicorn'. "
+            "Install them with: pip install starlette uvicorn"
+        ) from e
+
+    routes = []
+    if metrics is not None:
+        from .metrics import CONTENT_TYPE
+
+        async def handle_metrics(request):
+            return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+        routes.append(Route("/metrics", endpoint=handle_metrics, methods=["GET"]))
+
+    if transport == "sse":
+        from mcp.server.sse import SseServerTransport
+
+        sse = SseServerTransport("/messages/")
+
+        async def handle_sse(request):
+            async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+                await server.run(read_stream, write_stream, server.create_initialization_options())
+            return Response()
+
+        return Starlette(routes=[
+            *routes,
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+        ])
+
+    try:
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    except ImportError as e:
+        raise RuntimeError(
+            "The streamable HTTP transport requires mcp 1.8 or later. "
+            "Upgrade it with: pip install -U mcp, or use the sse transport"
+        ) from e
+
+    manager = StreamableHTTPSessionManager(app=server)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        async with manager.run():
+            yield
+
+    routes.append(Route(path, endpoint=_StreamableHTTPEndpoint(manager)))
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+async def serve(asgi_app, host="127.0.0.1", port=8765):
+    """Serve an ASGI app with uvicorn until the process is stopped."""
+    import uvicorn
+
+    config = uvicorn.Config(asgi_app, host=host, port=port, log_level="info")
+    await uvicorn.Server(config).serve()